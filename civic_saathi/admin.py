@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
 from datetime import timedelta
 from .models import (
     Department, Officer, Worker,
@@ -14,6 +16,57 @@ from .models import (
 admin.site.site_header = "Municipal Governance Panel"
 admin.site.site_title = "Municipal Admin"
 
+# Badge colours / labels used by the complaint list and change form
+_PRIORITY_COLORS = {1: '#6b7280', 2: '#16a34a', 3: '#ca8a04', 4: '#ea580c', 5: '#dc2626'}
+_PRIORITY_LABELS = {1: 'P1 Minimal', 2: 'P2 Low', 3: 'P3 Medium', 4: 'P4 High', 5: 'P5 Emergency'}
+_STATUS_COLORS = {
+    'SUBMITTED': '#17a2b8',
+    'FILTERING': '#6c757d',
+    'DECLINED': '#dc3545',
+    'SORTING': '#ffc107',
+    'PENDING': '#fd7e14',
+    'ASSIGNED': '#007bff',
+    'IN_PROGRESS': '#0056b3',
+    'RESOLVED': '#28a745',
+    'COMPLETED': '#155724',
+    'REJECTED': '#721c24',
+}
+_PRIORITY_MAP = {1: ('Normal', 'normal'), 2: ('High', 'high'), 3: ('Critical', 'critical')}
+
+# Change-form timer: SLA level -> (timer_status, icon, title, deadline label)
+_SLA_TIMER = {
+    'overdue': ('overdue', '⚠️', 'COMPLAINT OVERDUE!', 'Overdue By'),
+    'critical': ('warning', '🔥', 'URGENT: Deadline Approaching', 'Time Remaining'),
+    'warning': ('warning', '⏰', 'Deadline Approaching', 'Time Remaining'),
+    'ok': ('ok', '✓', 'Within SLA Timeline', 'Time Remaining'),
+}
+
+
+def _request_officer(request):
+    """Officer profile of the requesting user (None if not an officer), cached on the request."""
+    if not hasattr(request, '_officer_cache'):
+        request._officer_cache = getattr(request.user, 'officer', None)
+    return request._officer_cache
+
+
+def _sla_state(created_at, escalation_hours):
+    """
+    Classify how close a complaint is to its escalation deadline.
+    Returns (level, hours_elapsed, hours_until_escalation) where level is
+    'overdue', 'critical' (<= 2h left), 'warning' (<= 6h left) or 'ok'.
+    """
+    hours_elapsed = (timezone.now() - created_at).total_seconds() / 3600
+    hours_until_escalation = escalation_hours - hours_elapsed
+    if hours_until_escalation <= 0:
+        level = 'overdue'
+    elif hours_until_escalation <= 2:
+        level = 'critical'
+    elif hours_until_escalation <= 6:
+        level = 'warning'
+    else:
+        level = 'ok'
+    return level, hours_elapsed, hours_until_escalation
+
 
 # -----------------------------
 # Inline Logs (READ-ONLY)
@@ -30,6 +83,11 @@ class ComplaintLogInline(admin.TabularInline):
     )
     ordering = ('-timestamp',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            "action_by", "old_dept", "new_dept"
+        )
+
 
 # -----------------------------
 # Inline Assignments
@@ -38,7 +96,12 @@ class AssignmentInline(admin.TabularInline):
     model = Assignment
     extra = 0
     readonly_fields = ("assigned_by_officer", "timestamp")
-    
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            "assigned_by_officer__user", "assigned_to_worker__user"
+        )
+
 
 # -----------------------------
 # Inline Escalations
@@ -50,6 +113,11 @@ class ComplaintEscalationInline(admin.TabularInline):
     readonly_fields = ('escalated_from', 'escalated_to', 'reason', 'escalated_at')
     ordering = ('-escalated_at',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'escalated_from__user', 'escalated_to__user'
+        )
+
 
 # -----------------------------
 # Complaint Category
@@ -60,6 +128,9 @@ class ComplaintCategoryAdmin(admin.ModelAdmin):
     list_filter = ('department',)
     search_fields = ('name',)
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('sla_config', 'department')
+    
     def has_sla_config(self, obj):
         return hasattr(obj, 'sla_config')
     has_sla_config.boolean = True
@@ -75,6 +146,9 @@ class SLAConfigAdmin(admin.ModelAdmin):
     list_filter = ('category__department',)
     search_fields = ('category__name',)
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('category__department')
+    
     def department_name(self, obj):
         return obj.category.department.name
     department_name.short_description = 'Department'
@@ -149,6 +223,8 @@ class ComplaintAdmin(admin.ModelAdmin):
 
     list_per_page = 25
 
+    list_select_related = ("department", "current_worker__user", "category__sla_config")
+
     fieldsets = (
         ("Complaint Info", {
             "fields": ("user", "title", "description", "location", "city", "state", "image")
@@ -179,11 +255,9 @@ class ComplaintAdmin(admin.ModelAdmin):
     emergency_flag.short_description = 'Emergency'
 
     def priority_badge(self, obj):
-        colors = {1: '#6b7280', 2: '#16a34a', 3: '#ca8a04', 4: '#ea580c', 5: '#dc2626'}
-        labels = {1: 'P1 Minimal', 2: 'P2 Low', 3: 'P3 Medium', 4: 'P4 High', 5: 'P5 Emergency'}
         level = obj.priority_level or 1
-        color = colors.get(level, 'gray')
-        label = labels.get(level, f'P{level}')
+        color = _PRIORITY_COLORS.get(level, 'gray')
+        label = _PRIORITY_LABELS.get(level, f'P{level}')
         return format_html(
             '<span style="background-color: {}; color: white; padding: 3px 8px; border-radius: 3px; font-weight: bold; font-size: 11px;">{}</span>'
             ' <small style="color: #888;">SLA:{}h</small>',
@@ -192,19 +266,7 @@ class ComplaintAdmin(admin.ModelAdmin):
     priority_badge.short_description = 'Priority'
     
     def status_badge(self, obj):
-        color_map = {
-            'SUBMITTED': '#17a2b8',
-            'FILTERING': '#6c757d',
-            'DECLINED': '#dc3545',
-            'SORTING': '#ffc107',
-            'PENDING': '#fd7e14',
-            'ASSIGNED': '#007bff',
-            'IN_PROGRESS': '#0056b3',
-            'RESOLVED': '#28a745',
-            'COMPLETED': '#155724',
-            'REJECTED': '#721c24',
-        }
-        color = color_map.get(obj.status, '#6c757d')
+        color = _STATUS_COLORS.get(obj.status, '#6c757d')
         return format_html(
             '<span style="background-color: {}; color: white; padding: 3px 8px; border-radius: 3px;">{}</span>',
             color, obj.get_status_display()
@@ -214,30 +276,27 @@ class ComplaintAdmin(admin.ModelAdmin):
     def sla_indicator(self, obj):
         """Show SLA status with color indicator — uses AI SLA when available"""
         # Use AI-determined SLA hours if available
-        effective_hours = obj.sla_hours if (obj.sla_hours and obj.sla_hours != 48) else None
+        effective_hours = getattr(obj, 'sla_effective_hours', None)
         if effective_hours is None:
-            if not obj.category or not hasattr(obj.category, 'sla_config'):
-                return format_html('<span style="color: gray;">No SLA</span>')
-            effective_hours = obj.category.sla_config.escalation_hours
+            return format_html('<span style="color: gray;">No SLA</span>')
 
-        hours_elapsed = (timezone.now() - obj.created_at).total_seconds() / 3600
-        hours_until_escalation = effective_hours - hours_elapsed
-        
-        if hours_until_escalation <= 0:
+        level, _, hours_until_escalation = _sla_state(obj.created_at, effective_hours)
+
+        if level == 'overdue':
             # Exceeded deadline
             overdue_hours = f"{abs(hours_until_escalation):.1f}"
             return format_html(
                 '<span style="color: red; font-weight: bold;">⚠ OVERDUE ({}h)</span>',
                 overdue_hours
             )
-        elif hours_until_escalation <= 2:
+        elif level == 'critical':
             # Critical - less than 2 hours
             remaining = f"{hours_until_escalation:.1f}"
             return format_html(
                 '<span style="color: red; font-weight: bold;">🔥 {}h left</span>',
                 remaining
             )
-        elif hours_until_escalation <= 6:
+        elif level == 'warning':
             # Warning - less than 6 hours
             remaining = f"{hours_until_escalation:.1f}"
             return format_html(
@@ -254,37 +313,73 @@ class ComplaintAdmin(admin.ModelAdmin):
     sla_indicator.short_description = 'SLA Status'
     
     actions = ['escalate_complaints', 'mark_as_spam', 'assign_to_me']
+
+    # Rows streamed / written per round-trip by the bulk actions
+    BULK_BATCH_SIZE = 500
     
     def escalate_complaints(self, request, queryset):
         """Bulk escalate selected complaints"""
         from .email_service import send_escalation_email
-        
+
+        queryset = queryset.filter(department__isnull=False)
+
+        # Preload every candidate officer for the affected departments in one query
+        dept_ids = set(queryset.order_by().values_list('department_id', flat=True).distinct())
+        officers_by_dept = {}
+        officers = Officer.objects.filter(
+            department_id__in=dept_ids
+        ).select_related('user').order_by('id')
+        for officer in officers:
+            officers_by_dept.setdefault(officer.department_id, []).append(officer)
+
+        reason = f"Manually escalated by {request.user.get_full_name() or request.user.username}"
+        now = timezone.now()
         escalated = 0
-        for complaint in queryset:
-            if complaint.department:
-                # Find senior officer
-                officers = Officer.objects.filter(
-                    department=complaint.department
-                ).exclude(id=complaint.current_officer.id if complaint.current_officer else None)
-                
-                if officers.exists():
-                    senior_officer = officers.first()
-                    escalation = ComplaintEscalation.objects.create(
-                        complaint=complaint,
-                        escalated_from=complaint.current_officer,
-                        escalated_to=senior_officer,
-                        reason=f"Manually escalated by {request.user.get_full_name() or request.user.username}"
-                    )
-                    
-                    # Update status
-                    complaint.status = 'PENDING'
-                    complaint.priority = min(complaint.priority + 1, 3)
-                    complaint.save()
-                    
-                    # Send email
-                    send_escalation_email(escalation)
-                    escalated += 1
-        
+        escalations = []
+        escalated_complaints = []
+
+        def flush():
+            ComplaintEscalation.objects.bulk_create(escalations)
+            Complaint.objects.bulk_update(escalated_complaints, ['status', 'updated_at'])
+            # Send emails
+            for escalation in escalations:
+                send_escalation_email(escalation)
+            escalations.clear()
+            escalated_complaints.clear()
+
+        # Stream the selection so "select all" does not load every row at once
+        complaints = queryset.select_related(
+            'current_officer__user', 'current_worker__user'
+        ).iterator(chunk_size=self.BULK_BATCH_SIZE)
+        for complaint in complaints:
+            # Find senior officer
+            senior_officer = next(
+                (
+                    officer for officer in officers_by_dept.get(complaint.department_id, ())
+                    if officer.id != complaint.current_officer_id
+                ),
+                None,
+            )
+            if senior_officer is None:
+                continue
+
+            escalations.append(ComplaintEscalation(
+                complaint=complaint,
+                escalated_from=complaint.current_officer,
+                escalated_to=senior_officer,
+                reason=reason,
+            ))
+
+            # Update status
+            complaint.status = 'PENDING'
+            complaint.updated_at = now
+            escalated_complaints.append(complaint)
+            escalated += 1
+
+            if len(escalations) >= self.BULK_BATCH_SIZE:
+                flush()
+        flush()
+
         self.message_user(request, f"Successfully escalated {escalated} complaint(s).")
     escalate_complaints.short_description = "Escalate selected complaints"
     
@@ -295,26 +390,36 @@ class ComplaintAdmin(admin.ModelAdmin):
     
     def assign_to_me(self, request, queryset):
         """Assign selected complaints to current user (if they're an officer)"""
-        try:
-            officer = request.user.officer
-            updated = 0
-            for complaint in queryset:
-                complaint.current_officer = officer
-                complaint.status = 'ASSIGNED'
-                complaint.save()
-                
-                # Create log
-                ComplaintLog.objects.create(
-                    complaint=complaint,
+        officer = _request_officer(request)
+        if officer is None:
+            self.message_user(request, "You must be an officer to use this action.", level='error')
+            return
+
+        ids = list(queryset.values_list('id', flat=True))
+        Complaint.objects.filter(id__in=ids).update(
+            current_officer=officer,
+            status='ASSIGNED',
+            updated_at=timezone.now(),
+        )
+
+        # Create logs
+        note = f"Complaint self-assigned by {request.user.get_full_name()}"
+        assignee = officer.user.get_full_name()
+        ComplaintLog.objects.bulk_create(
+            [
+                ComplaintLog(
+                    complaint_id=complaint_id,
                     action_by=request.user,
-                    note=f"Complaint self-assigned by {request.user.get_full_name()}",
-                    new_assignee=officer.user.get_full_name()
+                    note=note,
+                    new_assignee=assignee,
                 )
-                updated += 1
-            
-            self.message_user(request, f"Assigned {updated} complaint(s) to you.")
-        except:
-            self.message_user(request, "You must be an officer to use this action.", level='error')
+                for complaint_id in ids
+            ],
+            batch_size=self.BULK_BATCH_SIZE,
+        )
+        updated = len(ids)
+        
+        self.message_user(request, f"Assigned {updated} complaint(s) to you.")
     assign_to_me.short_description = "Assign to me"
 
     # Add timer context to change form
@@ -325,45 +430,18 @@ class ComplaintAdmin(admin.ModelAdmin):
             obj = self.get_object(request, object_id)
             if obj and obj.category and hasattr(obj.category, 'sla_config'):
                 sla = obj.category.sla_config
-                hours_elapsed = (timezone.now() - obj.created_at).total_seconds() / 3600
-                hours_until_escalation = sla.escalation_hours - hours_elapsed
-                
-                # Determine status
-                if hours_until_escalation <= 0:
-                    timer_status = 'overdue'
-                    timer_icon = '⚠️'
-                    timer_title = 'COMPLAINT OVERDUE!'
-                    deadline_label = 'Overdue By'
-                    hours_remaining = abs(hours_until_escalation)
-                    is_overdue = True
-                elif hours_until_escalation <= 2:
-                    timer_status = 'warning'
-                    timer_icon = '🔥'
-                    timer_title = 'URGENT: Deadline Approaching'
-                    deadline_label = 'Time Remaining'
-                    hours_remaining = hours_until_escalation
-                    is_overdue = False
-                elif hours_until_escalation <= 6:
-                    timer_status = 'warning'
-                    timer_icon = '⏰'
-                    timer_title = 'Deadline Approaching'
-                    deadline_label = 'Time Remaining'
-                    hours_remaining = hours_until_escalation
-                    is_overdue = False
-                else:
-                    timer_status = 'ok'
-                    timer_icon = '✓'
-                    timer_title = 'Within SLA Timeline'
-                    deadline_label = 'Time Remaining'
-                    hours_remaining = hours_until_escalation
-                    is_overdue = False
+                level, hours_elapsed, hours_until_escalation = _sla_state(
+                    obj.created_at, sla.escalation_hours
+                )
+                timer_status, timer_icon, timer_title, deadline_label = _SLA_TIMER[level]
+                is_overdue = level == 'overdue'
+                hours_remaining = abs(hours_until_escalation) if is_overdue else hours_until_escalation
                 
                 # Priority text
-                priority_map = {1: ('Normal', 'normal'), 2: ('High', 'high'), 3: ('Critical', 'critical')}
-                priority_text, priority_class = priority_map.get(obj.priority, ('Normal', 'normal'))
+                priority_text, priority_class = _PRIORITY_MAP.get(obj.priority, ('Normal', 'normal'))
                 
                 # Escalation info
-                escalation_count = obj.escalations.count()
+                escalation_count = getattr(obj, '_escalation_count', 0)
                 
                 extra_context.update({
                     'timer_status': timer_status,
@@ -384,13 +462,34 @@ class ComplaintAdmin(admin.ModelAdmin):
     
     # 🔐 Department-wise admin visibility
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        qs = super().get_queryset(request).select_related(
+            "department", "category__sla_config",
+            "current_officer__user", "current_worker__user", "user",
+        ).annotate(
+            # AI-determined SLA wins over the category default (48 is the model default)
+            sla_effective_hours=Case(
+                When(Q(sla_hours__gt=0) & ~Q(sla_hours=48), then=F('sla_hours')),
+                default=F('category__sla_config__escalation_hours'),
+                output_field=IntegerField(),
+            ),
+            # Correlated count keeps the main query free of a GROUP BY
+            _escalation_count=Coalesce(
+                Subquery(
+                    ComplaintEscalation.objects.filter(complaint=OuterRef('pk'))
+                    .order_by()
+                    .values('complaint')
+                    .annotate(n=Count('id'))
+                    .values('n')
+                ),
+                0,
+            ),
+        )
         if request.user.is_superuser:
             return qs
-        try:
-            return qs.filter(department=request.user.officer.department)
-        except:
+        officer = _request_officer(request)
+        if officer is None:
             return qs.none()
+        return qs.filter(department_id=officer.department_id)
 
 
 # -----------------------------
@@ -402,6 +501,11 @@ class ComplaintEscalationAdmin(admin.ModelAdmin):
     list_filter = ('escalated_at', 'escalated_to__department')
     search_fields = ('complaint__title', 'reason')
     readonly_fields = ('complaint', 'escalated_from', 'escalated_to', 'reason', 'escalated_at')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'complaint', 'escalated_from__user', 'escalated_to__user'
+        )
     
     def complaint_link(self, obj):
         url = reverse('admin:civic_saathi_complaint_change', args=[obj.complaint.id])
@@ -429,6 +533,9 @@ class WorkerAttendanceAdmin(admin.ModelAdmin):
     search_fields = ('worker__user__username', 'worker__user__first_name', 'worker__user__last_name')
     date_hierarchy = 'date'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('worker__user', 'marked_by')
+
 
 # -----------------------------
 # Hide raw logs from main menu
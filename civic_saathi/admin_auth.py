@@ -5,35 +5,39 @@ from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
 
+class AdminUser:
+    """
+    Lightweight user object for admins authenticated via the frontend.
+    Not backed by a database row.
+    """
+    __slots__ = ('admin_token', 'admin_data')
+
+    is_authenticated = True
+    is_anonymous = False
+    is_admin = True
+    is_active = True  # Required by Django permissions
+    is_staff = True
+    id = 'admin'
+    username = 'admin'
+    pk = 'admin'  # Primary key
+
+    def __init__(self, admin_token, admin_data):
+        self.admin_token = admin_token
+        self.admin_data = admin_data
+
+
 class AdminTokenAuthentication(BaseAuthentication):
     """
     Custom authentication for admin users.
     Checks for X-Admin-Token and X-Admin-User headers.
     """
-    
+
     def authenticate(self, request):
         admin_token = request.META.get('HTTP_X_ADMIN_TOKEN')
         admin_user = request.META.get('HTTP_X_ADMIN_USER')
-        
+
         if admin_token and admin_user:
             # Admin is authenticated via frontend
-            # Return a mock user object
-            class AdminUser:
-                def __init__(self, admin_data):
-                    self.is_authenticated = True
-                    self.is_admin = True
-                    self.is_active = True  # Required by Django permissions
-                    self.is_staff = True
-                    self.admin_token = admin_token
-                    self.admin_data = admin_data
-                    self.id = 'admin'
-                    self.username = 'admin'
-                    self.pk = 'admin'  # Primary key
-                    
-                @property
-                def is_anonymous(self):
-                    return False
-            
-            return (AdminUser(admin_user), None)
-        
+            return (AdminUser(admin_token, admin_user), None)
+
         return None
@@ -10,12 +10,24 @@ NOTE: AI is used as a classification assistant, not a sole decision-maker.
 All AI decisions are logged for transparency and audit.
 """
 
+import asyncio
+import hashlib
+import io
 import json
 import logging
+import threading
+import httpx
 from google import genai
 from google.genai import types
 from django.conf import settings
-from PIL import Image
+from django.core.cache import cache
+from PIL import Image, ImageOps
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -29,38 +41,70 @@ _DEFAULTS = {
     'emergency': False,
 }
 
+# Exact (whitespace-stripped) form of the system instruction's reject example
+_FAST_NO = '{"genuine":"NO","sla_hours":48,"priority":1,"emergency":false}'
+
+_MODEL = getattr(settings, 'GEMINI_CLASSIFIER_MODEL', 'gemini-2.5-flash-lite')
+
+# Keep warm TLS connections to Gemini around between complaint submissions
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=64,
+    max_keepalive_connections=32,
+    keepalive_expiry=120,
+)
+
+# Shared Gemini client — built once per process, reused across requests
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client():
+    """Return the process-wide Gemini client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client(
+                    api_key=settings.GEMINI_API_KEY,
+                    # Explicit httpx async transport so client.aio does real
+                    # non-blocking I/O rather than falling back to threads
+                    http_options=types.HttpOptions(
+                        client_args={'limits': _HTTP_LIMITS},
+                        async_client_args={
+                            'transport': httpx.AsyncHTTPTransport(limits=_HTTP_LIMITS),
+                        },
+                    ),
+                )
+    return _client
+
+
+# The one event loop every client.aio call runs on; the client's pooled
+# connections are bound to the loop that opened them
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='ai-filter-loop', daemon=True).start()
+                _loop = loop
+    return _loop
 
-def classify_complaint(image_path: str, description: str) -> dict:
-    """
-    AI-assisted verification **and** severity classification of a complaint.
-
-    Sends the complaint image + description to Gemini Vision and asks it to
-    return a structured JSON object with genuineness, SLA, priority, and
-    emergency flag.
-
-    Returns:
-        dict with keys:
-            genuine   (str)  – 'YES' or 'NO'
-            sla_hours (int)  – recommended SLA in hours (2-48)
-            priority  (int)  – 1=Minimal, 2=Low, 3=Medium, 4=High, 5=Emergency
-            emergency (bool) – True when immediate attention is needed
-
-    Raises:
-        Exception – caller must handle and apply fail-safe logic
-    """
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
-    image = Image.open(image_path)
 
-    prompt = f"""
+# ---------------------------------------------------------------------------
+# Classification prompt — fixed rubric + per-complaint description
+# ---------------------------------------------------------------------------
+_SYSTEM_INSTRUCTION = """
 You are a STRICT authenticity checker AND severity classifier for CivicSaathi, a Smart City civic complaints platform.
 
 Your job is TWO-FOLD:
   A) Decide whether the image is a legitimate photo of a real, visible civic infrastructure problem.
   B) If genuine, assess HOW SEVERE the issue is and recommend SLA / priority.
 
-=== COMPLAINT DESCRIPTION ===
-"{description}"
-
 === THE 14 VALID MUNICIPAL DEPARTMENTS AND THEIR ACCEPTED ISSUE TYPES ===
 1. Engineering / Public Works Department (Urban)
    - Potholes, broken/damaged roads, caved-in footpaths, damaged bridges, collapsed walls/fencing, construction debris blocking roads
@@ -148,13 +192,232 @@ Use the following guidelines to set sla_hours and priority:
 You MUST respond with ONLY a valid JSON object — no markdown fences, no explanation, no extra text.
 When genuine is "NO", set sla_hours to 48, priority to 1, emergency to false.
 Example:
-{{"genuine": "YES", "sla_hours": 6, "priority": 5, "emergency": true}}
-{{"genuine": "NO", "sla_hours": 48, "priority": 1, "emergency": false}}
+{"genuine": "YES", "sla_hours": 6, "priority": 5, "emergency": true}
+{"genuine": "NO", "sla_hours": 48, "priority": 1, "emergency": false}
 """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=[image, prompt],
+_PROMPT_TEMPLATE = """
+=== COMPLAINT DESCRIPTION ===
+"{description}"
+"""
+
+
+def _thinking_budget(model: str):
+    """
+    Thinking tokens for ``model``: GEMINI_THINKING_BUDGET if set, else 0
+    (no reasoning pass; the answer is one small JSON object) on Flash
+    models and None, the model's own default, elsewhere, as Pro models
+    cannot turn thinking off.
+    """
+    budget = getattr(settings, 'GEMINI_THINKING_BUDGET', None)
+    if budget is None and 'flash' in model:
+        budget = 0
+    return budget
+
+
+_THINKING_BUDGET = _thinking_budget(_MODEL)
+# Room for the JSON answer; thinking tokens count against the same cap,
+# so it is lifted entirely when the budget is dynamic (None or -1)
+_ANSWER_TOKENS = 64
+_DYNAMIC_THINKING = _THINKING_BUDGET is None or _THINKING_BUDGET < 0
+
+_GENERATION_CONFIG = types.GenerateContentConfig(
+    temperature=0.0,
+    max_output_tokens=None if _DYNAMIC_THINKING else _ANSWER_TOKENS + _THINKING_BUDGET,
+    thinking_config=(
+        None if _THINKING_BUDGET is None
+        else types.ThinkingConfig(thinking_budget=_THINKING_BUDGET)
+    ),
+    # Static rubric as a system instruction: a stable prefix Gemini can cache
+    system_instruction=_SYSTEM_INSTRUCTION,
+    # Structured output: the model must return exactly these fields
+    response_mime_type='application/json',
+    response_schema={
+        'type': 'OBJECT',
+        'properties': {
+            'genuine': {'type': 'STRING', 'enum': ['YES', 'NO']},
+            'sla_hours': {'type': 'INTEGER'},
+            'priority': {'type': 'INTEGER'},
+            'emergency': {'type': 'BOOLEAN'},
+        },
+        'required': ['genuine', 'sla_hours', 'priority', 'emergency'],
+        'propertyOrdering': ['genuine', 'sla_hours', 'priority', 'emergency'],
+    },
+)
+
+# Long-edge cap for images sent to Gemini; plenty for damage classification
+_MAX_IMAGE_EDGE = 1024
+_JPEG_QUALITY = 85
+# Already-small JPEG/PNG uploads are sent as-is, skipping decode/re-encode
+_PASSTHROUGH_FORMATS = {'JPEG': 'image/jpeg', 'PNG': 'image/png'}
+_PASSTHROUGH_MAX_BYTES = 512 * 1024
+_EXIF_ORIENTATION = 0x0112
+
+
+# Classifications are cached per (image, description); the image is immutable
+_CACHE_TIMEOUT = getattr(settings, 'AI_CLASSIFICATION_CACHE_TIMEOUT', 60 * 60 * 24 * 30)
+
+
+def _prepare_image(image_bytes: bytes) -> types.Part:
+    """Downscale and re-encode the complaint photo as a compact JPEG part."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        # Image.open only parses the header, so this check is cheap
+        mime_type = _PASSTHROUGH_FORMATS.get(img.format)
+        if (
+            mime_type
+            and len(image_bytes) <= _PASSTHROUGH_MAX_BYTES
+            and max(img.size) <= _MAX_IMAGE_EDGE
+            and img.getexif().get(_EXIF_ORIENTATION, 1) == 1
+        ):
+            return types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((_MAX_IMAGE_EDGE, _MAX_IMAGE_EDGE), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.convert('RGB').save(buf, 'JPEG', quality=_JPEG_QUALITY, optimize=True)
+    return types.Part.from_bytes(data=buf.getvalue(), mime_type='image/jpeg')
+
+
+def classify_complaint(image_path: str, description: str) -> dict:
+    """
+    AI-assisted verification **and** severity classification of a complaint.
+
+    Sends the complaint image + description to Gemini Vision and asks it to
+    return a structured JSON object with genuineness, SLA, priority, and
+    emergency flag.
+
+    Returns:
+        dict with keys:
+            genuine   (str)  – 'YES' or 'NO'
+            sla_hours (int)  – recommended SLA in hours (2-48)
+            priority  (int)  – 1=Minimal, 2=Low, 3=Medium, 4=High, 5=Emergency
+            emergency (bool) – True when immediate attention is needed
+
+    Raises:
+        Exception – caller must handle and apply fail-safe logic
+    """
+    image_bytes = _read_file(image_path)
+
+    cache_key = _cache_key(image_bytes, description)
+    result = cache.get(cache_key)
+    if result is not None:
+        return result
+
+    result, parsed = _classify(image_bytes, description)
+    if parsed:
+        cache.set(cache_key, result, timeout=_CACHE_TIMEOUT)
+    return result
+
+
+async def classify_complaint_async(image_path: str, description: str) -> dict:
+    """
+    Non-blocking variant of classify_complaint() for async views and tasks.
+
+    Uses the Gemini async client so the event loop is free while the model
+    runs; file reading and image re-encoding run in a worker thread.
+    Returns the same dict and shares the same cache.
+
+    The request itself always runs on the shared loop from _get_loop(),
+    whichever loop awaits this: the async client's pooled connections can
+    only be used from the loop that opened them.
+    """
+    loop = _get_loop()
+    coro = _classify_on_shared_loop(image_path, description)
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+async def _classify_on_shared_loop(image_path: str, description: str) -> dict:
+    image_bytes = await asyncio.to_thread(_read_file, image_path)
+
+    cache_key = _cache_key(image_bytes, description)
+    result = await cache.aget(cache_key)
+    if result is not None:
+        return result
+
+    contents = await asyncio.to_thread(_build_contents, image_bytes, description)
+    response = await _get_client().aio.models.generate_content(
+        model=_MODEL,
+        contents=contents,
+        config=_GENERATION_CONFIG,
+    )
+    result, parsed = _parse_ai_response(response.text.strip())
+    if parsed:
+        await cache.aset(cache_key, result, timeout=_CACHE_TIMEOUT)
+    return result
+
+
+def classify_complaint_in_background(image_path: str, description: str, callback):
+    """
+    Start classify_complaint_async() on the shared loop and return at once.
+
+    ``callback`` is called with the finished concurrent.futures.Future
+    (``.result()`` gives the dict or raises).  It runs on the loop thread,
+    so it must hand any blocking work (database, email) to another thread.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        classify_complaint_async(image_path, description), _get_loop()
+    )
+    future.add_done_callback(callback)
+    return future
+
+
+def classify_complaints_batch(items, max_concurrency: int = 8) -> list:
+    """
+    Classify several (image_path, description) pairs concurrently.
+
+    Each complaint keeps its own prompt; up to ``max_concurrency`` Gemini
+    requests are in flight at once instead of running back to back.
+    Returns results in input order — a failed item yields its exception
+    instead of a dict so the caller can apply the fail-safe per complaint.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        _classify_batch(list(items), max_concurrency), _get_loop()
+    )
+    return future.result()
+
+
+async def _classify_batch(items: list, max_concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(image_path, description):
+        async with semaphore:
+            return await _classify_on_shared_loop(image_path, description)
+
+    return await asyncio.gather(
+        *(run(image_path, description) for image_path, description in items),
+        return_exceptions=True,
+    )
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as fh:
+        return fh.read()
+
+
+def _cache_key(image_bytes: bytes, description: str) -> str:
+    # Case / surrounding whitespace do not change the verdict, so ignore them
+    return 'ai_classify:{}:{}'.format(
+        hashlib.sha256(image_bytes).hexdigest(),
+        hashlib.sha256(description.strip().lower().encode('utf-8')).hexdigest(),
+    )
+
+
+def _build_contents(image_bytes: bytes, description: str) -> list:
+    """Image part + rendered prompt, in the order Gemini expects."""
+    return [
+        _prepare_image(image_bytes),
+        _PROMPT_TEMPLATE.format(description=description),
+    ]
+
+
+def _classify(image_bytes: bytes, description: str) -> tuple:
+    """Run the Gemini classification; returns _parse_ai_response()'s pair."""
+    response = _get_client().models.generate_content(
+        model=_MODEL,
+        contents=_build_contents(image_bytes, description),
+        config=_GENERATION_CONFIG,
     )
     raw = response.text.strip()
 
@@ -162,25 +425,32 @@ Example:
     return _parse_ai_response(raw)
 
 
-def _parse_ai_response(raw: str) -> dict:
-    """Parse Gemini's raw text into a validated classification dict."""
+def _parse_ai_response(raw: str) -> tuple:
+    """
+    Parse Gemini's raw text into a validated classification dict.
+
+    Returns ``(result, parsed)``; ``parsed`` is False when the verdict was
+    only guessed from unparseable text, so callers must not cache it.
+    """
     # Strip potential markdown code fences
     cleaned = raw.strip()
     if cleaned.startswith('```'):
-        cleaned = cleaned.split('\n', 1)[-1]  # remove first line
-    if cleaned.endswith('```'):
-        cleaned = cleaned.rsplit('```', 1)[0]
-    cleaned = cleaned.strip()
+        cleaned = cleaned.split('\n', 1)[-1]  # remove ``` / ```json line
+    cleaned = cleaned.removesuffix('```').strip()
+
+    # Fast path: the canonical reject answer needs no JSON parsing
+    if ''.join(cleaned.split()) == _FAST_NO:
+        return {'genuine': 'NO', 'sla_hours': 48, 'priority': 1, 'emergency': False}, True
 
     try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError:
+        data = _json_loads(cleaned)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses this
         # Fallback: try to detect YES / NO from the raw text
         upper = raw.upper()
         if upper.startswith('NO'):
-            return {'genuine': 'NO', 'sla_hours': 48, 'priority': 1, 'emergency': False}
+            return {'genuine': 'NO', 'sla_hours': 48, 'priority': 1, 'emergency': False}, False
         if upper.startswith('YES'):
-            return {**_DEFAULTS, 'genuine': 'YES'}
+            return {**_DEFAULTS, 'genuine': 'YES'}, False
         raise ValueError(f"Gemini returned unparseable response: {raw!r}")
 
     # Normalise fields with safe defaults
@@ -201,7 +471,7 @@ def _parse_ai_response(raw: str) -> dict:
         'sla_hours': sla_hours,
         'priority': priority,
         'emergency': emergency,
-    }
+    }, True
 
 
 # ---------------------------------------------------------------------------
@@ -211,3 +481,9 @@ def is_complaint_genuine(image_path: str, description: str) -> bool:
     """Legacy wrapper — returns True/False only. Prefer classify_complaint()."""
     result = classify_complaint(image_path, description)
     return result['genuine'] == 'YES'
+
+
+async def is_complaint_genuine_async(image_path: str, description: str) -> bool:
+    """Async counterpart of is_complaint_genuine() for async views."""
+    result = await classify_complaint_async(image_path, description)
+    return result['genuine'] == 'YES'
@@ -6,5 +6,7 @@ class CivicSaathiConfig(AppConfig):
     name = "civic_saathi"
     
     def ready(self):
-        """Import signals when the app is ready"""
+        """Import signals and compile email templates when the app is ready"""
         import civic_saathi.signals  # noqa
+        from civic_saathi.email_service import warm_templates
+        warm_templates()
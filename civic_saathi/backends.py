@@ -0,0 +1,86 @@
+"""
+Email backends for CivicSaathi.
+"""
+import re
+import smtplib
+
+from django.conf import settings
+from django.core.mail.backends.smtp import EmailBackend
+from django.core.mail.message import sanitize_address
+
+_LEADING_DOT = re.compile(rb'(?m)^\.')
+_CRLF = b'\r\n'
+
+
+class PipeliningEmailBackend(EmailBackend):
+    """
+    SMTP backend that pipelines MAIL FROM, RCPT TO and DATA (RFC 2920).
+
+    When the server advertises PIPELINING the envelope commands are written
+    in one go and their replies read back together, so a message costs two
+    round-trips instead of three plus one per recipient.  Servers without
+    the extension get Django's regular command-by-command exchange.
+    """
+
+    def _send(self, email_message):
+        if not email_message.recipients():
+            return False
+        self.connection.ehlo_or_helo_if_needed()
+        if not self.connection.has_extn('pipelining'):
+            return super()._send(email_message)
+
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = [
+            sanitize_address(addr, encoding) for addr in email_message.recipients()
+        ]
+        message = email_message.message()
+        try:
+            self._pipelined_sendmail(
+                from_email, recipients, message.as_bytes(linesep='\r\n')
+            )
+        except smtplib.SMTPException:
+            if not self.fail_silently:
+                raise
+            return False
+        return True
+
+    def _pipelined_sendmail(self, from_email, recipients, msg):
+        """Pipelined equivalent of ``smtplib.SMTP.sendmail``."""
+        connection = self.connection
+        size = f" SIZE={len(msg)}" if connection.has_extn('size') else ''
+        commands = [f"MAIL FROM:{smtplib.quoteaddr(from_email)}{size}"]
+        commands += [f"RCPT TO:{smtplib.quoteaddr(addr)}" for addr in recipients]
+        commands.append("DATA")
+        connection.send(''.join(f"{command}\r\n" for command in commands))
+
+        sender_reply = connection.getreply()
+        refused = {}
+        for addr in recipients:
+            code, resp = connection.getreply()
+            if code not in (250, 251):
+                refused[addr] = (code, resp)
+        code, resp = connection.getreply()
+
+        if sender_reply[0] != 250 or len(refused) == len(recipients):
+            if code == 354:
+                # Server accepted DATA regardless; end it with an empty body
+                connection.send(b'.' + _CRLF)
+                connection.getreply()
+            connection.rset()
+            if sender_reply[0] != 250:
+                raise smtplib.SMTPSenderRefused(*sender_reply, from_email)
+            raise smtplib.SMTPRecipientsRefused(refused)
+        if code != 354:
+            connection.rset()
+            raise smtplib.SMTPDataError(code, resp)
+
+        data = _LEADING_DOT.sub(b'..', msg)
+        if not data.endswith(_CRLF):
+            data += _CRLF
+        connection.send(data + b'.' + _CRLF)
+        code, resp = connection.getreply()
+        if code != 250:
+            connection.rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
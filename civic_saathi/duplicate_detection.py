@@ -26,7 +26,7 @@ Duplicate flow
 ──────────────
 • Generate primary hash + 9 neighbor-cell candidate hashes.
 • Query DB for ANY matching hash among active complaints.
-• Confirm match with Haversine distance ≤ 50 m.
+• Confirm match with distance ≤ 50 m (equirectangular approximation).
 • Hash matches + same user   → reject  ("You have already reported this issue.")
 • Hash matches + diff user   → auto-upvote existing complaint.
 • No match                   → create new complaint & store hash.
@@ -34,11 +34,19 @@ Duplicate flow
 
 from __future__ import annotations
 
+import functools
 import hashlib
 import math
 import re
 from difflib import SequenceMatcher
 
+try:
+    # Indel similarity (2·LCS / total length) is an upper bound on
+    # SequenceMatcher.ratio(), computed in C++ — used only to prune.
+    from rapidfuzz.distance import Indel as _Indel
+except ImportError:  # rapidfuzz is optional
+    _Indel = None
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Stopwords  (aggressive — includes adjectives / filler words so only
@@ -166,6 +174,9 @@ _SEMANTIC_CATEGORIES: dict[str, str] = {
 }
 
 
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
 def _extract_keywords(title: str) -> list[str]:
     """Tokenise, lowercase, strip stopwords and short (≤2 char) tokens."""
     tokens = re.findall(r"[a-zA-Z]+", (title or "").lower())
@@ -178,6 +189,11 @@ def _best_semantic_match(keywords: list[str]) -> str | None:
 
     Pass 1 — Direct lookup (O(1) per keyword).
     Pass 2 — Fuzzy match via SequenceMatcher (≥ 0.70 threshold).
+
+    Pass 2 only computes the full ratio() when its cheap upper bounds
+    (length bound, then Indel similarity via rapidfuzz or quick_ratio)
+    could still beat the current best, so the chosen code is identical
+    to scoring every pair.
     """
     # Pass 1: exact match
     for kw in keywords:
@@ -188,17 +204,33 @@ def _best_semantic_match(keywords: list[str]) -> str | None:
     best_code: str | None = None
     best_score = 0.0
     for kw in keywords:
+        kw_len = len(kw)
         for known_kw, code in _SEMANTIC_CATEGORIES.items():
             if known_kw in kw or kw in known_kw:
                 score = 0.85
             else:
-                score = SequenceMatcher(None, kw, known_kw).ratio()
+                # A score must be >= 0.70 and strictly beat best_score to count
+                floor = best_score if best_score >= 0.70 else 0.70
+                known_len = len(known_kw)
+                if 2.0 * min(kw_len, known_len) / (kw_len + known_len) < floor:
+                    continue
+                if _Indel is not None:
+                    # Small epsilon guards float rounding at an exact tie
+                    if _Indel.normalized_similarity(kw, known_kw) < floor - 1e-9:
+                        continue
+                    matcher = SequenceMatcher(None, kw, known_kw)
+                else:
+                    matcher = SequenceMatcher(None, kw, known_kw)
+                    if matcher.quick_ratio() < floor:
+                        continue
+                score = matcher.ratio()
             if score > best_score and score >= 0.70:
                 best_score = score
                 best_code = code
     return best_code
 
 
+@functools.lru_cache(maxsize=4096)
 def _title_hash(title: str) -> str:
     """
     Produce a **3-character uppercase** semantic code from the title.
@@ -218,14 +250,11 @@ def _title_hash(title: str) -> str:
     if code:
         return code
 
-    # Fallback: deterministic hash of sorted keywords → 3 uppercase chars
+    # Fallback: deterministic hash of sorted keywords → 3 uppercase chars.
+    # MD5 is kept (not a faster hash) so codes match hashes already stored.
     joined = "".join(sorted(kws))
-    digest = hashlib.md5(joined.encode()).hexdigest()
-    chars = []
-    for i in range(3):
-        val = int(digest[i * 2 : i * 2 + 2], 16) % 26
-        chars.append(chr(ord("A") + val))
-    return "".join(chars)
+    digest = hashlib.md5(joined.encode()).digest()
+    return "".join(_ALPHABET[b % 26] for b in digest[:3])
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -244,12 +273,13 @@ def _title_hash(title: str) -> str:
 _LAT_CELL = 30.0 / 111_320.0   # ≈ 0.0002696°
 
 _BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# All 36² = 1296 two-character codes, indexed by value
+_BASE36_2: tuple[str, ...] = tuple(a + b for a in _BASE36 for b in _BASE36)
 
 
 def _encode_base36_2char(value: int) -> str:
     """Encode an integer into exactly 2 base-36 characters (0–1295)."""
-    value = abs(value) % 1296      # 36² = 1296
-    return _BASE36[value // 36] + _BASE36[value % 36]
+    return _BASE36_2[abs(value) % 1296]
 
 
 def _lat_index(latitude: float) -> int:
@@ -296,15 +326,16 @@ def _location_hashes_3x3(latitude, longitude) -> list[str]:
     lat_idx = _lat_index(lat_f)
     lng_idx = _lon_index(lat_f, lng_f)
 
-    hashes: set[str] = set()
-    for dlat in (-1, 0, 1):
-        for dlng in (-1, 0, 1):
-            h = (
-                _encode_base36_2char(lat_idx + dlat)
-                + _encode_base36_2char(lng_idx + dlng)
-            )
-            hashes.add(h)
-    return list(hashes)
+    # Encode each axis once.  Codes can still collide near index 0 (abs)
+    # or at the 1296 wrap-around, so dedup per axis; the fixed-width
+    # concatenations of two distinct-code lists are then all distinct.
+    lat_codes = dict.fromkeys(
+        _encode_base36_2char(lat_idx + d) for d in (-1, 0, 1)
+    )
+    lng_codes = dict.fromkeys(
+        _encode_base36_2char(lng_idx + d) for d in (-1, 0, 1)
+    )
+    return [a + b for a in lat_codes for b in lng_codes]
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -336,6 +367,18 @@ _DEPT_CODES: dict[str, str] = {
 }
 
 
+# Dict position of each key — "first key in table order" decides ties
+_DEPT_ORDER = {key: i for i, key in enumerate(_DEPT_CODES)}
+_DEPT_MAX_KEY_LEN = max(map(len, _DEPT_CODES))
+# Zero-width lookahead so overlapping keys are all reported in one C-level scan.
+# Only one key is reported per start position, so no key may be a prefix
+# of another key in _DEPT_CODES.
+_DEPT_KEY_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_DEPT_CODES, key=len, reverse=True))) + "))"
+)
+
+
+@functools.lru_cache(maxsize=4096)
 def _dept_hash(department_name: str | None) -> str:
     """
     Return a stable 3-character uppercase department code.
@@ -348,10 +391,13 @@ def _dept_hash(department_name: str | None) -> str:
 
     name_lower = department_name.strip().lower()
 
-    # Direct / partial match against known codes
-    for key, code in _DEPT_CODES.items():
-        if key in name_lower or name_lower in key:
-            return code
+    # Direct / partial match against known codes: keys contained in the
+    # name, plus (for short names only) keys that contain the name
+    hits = {m.group(1) for m in _DEPT_KEY_RE.finditer(name_lower)}
+    if len(name_lower) <= _DEPT_MAX_KEY_LEN:
+        hits.update(key for key in _DEPT_CODES if name_lower in key)
+    if hits:
+        return _DEPT_CODES[min(hits, key=_DEPT_ORDER.__getitem__)]
 
     # Fallback: first 3 uppercase consonants
     consonants = [c for c in name_lower if c.isalpha() and c not in "aeiou"]
@@ -360,26 +406,34 @@ def _dept_hash(department_name: str | None) -> str:
 
 
 # ═══════════════════════════════════════════════════════════════════════════
-# Haversine distance helper
+# Distance helper
 # ═══════════════════════════════════════════════════════════════════════════
 
-def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Return the great-circle distance in **metres** between two GPS points."""
-    R = 6_371_000  # Earth radius in metres
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    d_phi = math.radians(lat2 - lat1)
-    d_lam = math.radians(lon2 - lon1)
-    a = (
-        math.sin(d_phi / 2) ** 2
-        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lam / 2) ** 2
-    )
-    return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+def _approx_distance_from(lat1: float, lon1: float):
+    """
+    Return ``f(lat2, lon2)`` giving the equirectangular distance in metres
+    from a fixed origin.
+
+    At the ≤ 50 m scale of duplicate checks curvature is negligible (error
+    well under 0.1 m), so a single cosine for the origin replaces the six
+    transcendental calls per point of the haversine formula.
+    """
+    m_per_deg = 6_371_000 * math.pi / 180
+    x_scale = m_per_deg * math.cos(math.radians(lat1))
+
+    def distance(lat2: float, lon2: float) -> float:
+        dx = (lon2 - lon1) * x_scale
+        dy = (lat2 - lat1) * m_per_deg
+        return math.sqrt(dx * dx + dy * dy)
+
+    return distance
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Public API
 # ═══════════════════════════════════════════════════════════════════════════
 
+@functools.lru_cache(maxsize=4096)
 def generate_smart_hash(
     title: str,
     latitude,
@@ -417,15 +471,17 @@ def generate_candidate_hashes(
     t = _title_hash(title)
     d = _dept_hash(department_name)
     loc_hashes = _location_hashes_3x3(latitude, longitude)
-    return list({f"{t}{lh}{d}" for lh in loc_hashes})
+    # Location hashes are already unique, so the full hashes are too
+    return [t + lh + d for lh in loc_hashes]
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Duplicate lookup
 # ═══════════════════════════════════════════════════════════════════════════
 
-# Active statuses considered for duplicate matching
-_ACTIVE_STATUSES = [
+# Active statuses considered for duplicate matching (also the predicate of
+# the partial ``active_smarthash_idx`` index on Complaint)
+ACTIVE_STATUSES = [
     "SUBMITTED",
     "FILTERING",
     "VERIFIED",
@@ -455,7 +511,7 @@ def find_duplicate(
         ``generate_candidate_hashes``).  If provided the DB query covers the
         entire 3×3 grid neighborhood.
     new_lat, new_lng : float | None
-        Coordinates of the new complaint.  When provided a Haversine check
+        Coordinates of the new complaint.  When provided a distance check
         confirms the match is truly within 50 m (guards against base-36
         collisions across distant locations).
 
@@ -474,26 +530,23 @@ def find_duplicate(
         Complaint.objects.filter(
             smart_hash__in=list(all_hashes),
             is_deleted=False,
-            status__in=_ACTIVE_STATUSES,
+            status__in=ACTIVE_STATUSES,
         )
         .order_by("created_at")
     )
 
-    if not matches.exists():
-        return None
-
-    # If we have coordinates, verify with Haversine (50 m generous tolerance)
-    if new_lat is not None and new_lng is not None:
-        for complaint in matches:
-            if complaint.latitude is not None and complaint.longitude is not None:
-                dist = _haversine_m(
-                    new_lat, new_lng,
-                    float(complaint.latitude), float(complaint.longitude),
-                )
-                if dist <= 50.0:
-                    return complaint
-        # All matches are > 50 m away — likely a hash collision, not a dup
-        return None
-
     # No coordinates to verify — trust the hash
-    return matches.first()
+    if new_lat is None or new_lng is None:
+        return matches.first()
+
+    # Verify distance (50 m generous tolerance) on coordinates only, then
+    # load just the matching row
+    distance_to = _approx_distance_from(new_lat, new_lng)
+    candidates = matches.exclude(latitude__isnull=True).exclude(longitude__isnull=True)
+    for pk, lat, lng in candidates.values_list("pk", "latitude", "longitude").iterator(
+        chunk_size=200
+    ):
+        if distance_to(float(lat), float(lng)) <= 50.0:
+            return Complaint.objects.get(pk=pk)
+    # No matches, or all are > 50 m away — likely a hash collision, not a dup
+    return None
@@ -1,161 +1,263 @@
 """
 Email Service for Municipal Governance System
 Handles all email notifications for complaints, assignments, escalations, etc.
+
+Message bodies live in ``templates/emails/*.txt`` and are rendered as plain
+text (no HTML autoescaping).
+
+The public ``send_*`` helpers only record primary keys and return None;
+the complaint (or escalation) and any worker or officer are re-fetched with
+their related rows joined, and the messages are built and delivered on the
+background email pool.  Delivery failures are logged there, not reported
+to the caller.
 """
-from django.core.mail import send_mail
+import functools
+import hashlib
+import logging
+from pathlib import Path
+
 from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.template import Context, Engine
+
+from .models import Complaint, ComplaintEscalation, Officer, Worker
+from .tasks import (
+    EMAIL_BULK, EMAIL_DEFAULT, EMAIL_URGENT, enqueue, enqueue_on, send_messages_task,
+)
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
-# Base helper
+# Base helpers
 # ---------------------------------------------------------------------------
 
+_TEMPLATE_DIR = Path(__file__).resolve().parent / "templates" / "emails"
+
+# Settings are fixed for the life of the process; resolve them once
+_FROM = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@municipal.gov')
+_SITE_URL = getattr(settings, 'SITE_URL', 'http://localhost:8000')
+
+# Identical messages to the same recipients within this window are dropped
+_DEDUP_TIMEOUT = 5 * 60
+# At most one upvote notification per complaint per this many seconds
+_UPVOTE_EMAIL_INTERVAL = 60 * 60
+# Both limits live in the default cache: deployment-wide with REDIS_URL set,
+# per worker process with the in-memory fallback
+
+
+@functools.lru_cache(maxsize=None)
+def _template(name):
+    """Compiled email template; each one is parsed once per process."""
+    return Engine.get_default().get_template(f"emails/{name}")
+
+
+def warm_templates():
+    """Compile every email template up front so no request pays for it."""
+    for path in _TEMPLATE_DIR.glob("*.txt"):
+        _template(path.name)
+
+
+def _render(name, **context):
+    """Render a plain-text email body."""
+    return _template(name).render(Context(context, autoescape=False))
+
+
+def _fetch_complaint_for_email(pk):
+    """Load a complaint with every relation the email templates touch."""
+    return Complaint.objects.select_related(
+        'user', 'department', 'office',
+        'current_worker__user', 'current_officer__user',
+    ).get(pk=pk)
+
+
+def _fetch_escalation_for_email(pk):
+    """Load an escalation, its complaint and the people involved in one query."""
+    return ComplaintEscalation.objects.select_related(
+        'complaint__user', 'complaint__department',
+        'complaint__current_worker__user', 'complaint__current_officer__user',
+        'escalated_to__user', 'escalated_from__user',
+    ).get(pk=pk)
+
+
+def _dedup_key(message):
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (",".join(sorted(message.recipients())), message.subject, message.body):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return f"email-dedup:{digest.hexdigest()}"
+
+
+def _first_send(message):
+    """True unless an identical message went to the same recipients just now."""
+    # cache.add is atomic, so concurrent duplicates cannot both get through
+    return cache.add(_dedup_key(message), 1, timeout=_DEDUP_TIMEOUT)
+
+
+def _release_unsent(messages):
+    """Free the dedup claim of undelivered messages so a retry can go out."""
+    cache.delete_many([_dedup_key(m) for m in messages])
+
+
+def _build_and_send(fetch, pk, build, args, fail_silently):
+    try:
+        messages = build(fetch(pk), *args)
+    except Exception:
+        logger.exception("%s(%s) failed", build.__name__, pk)
+        return
+    messages = [m for m in messages if _first_send(m)]
+    if messages:
+        send_messages_task(
+            messages, fail_silently=fail_silently, on_unsent=_release_unsent
+        )
+
+
+def _send_later(build, obj, *args, fail_silently=False, tier=EMAIL_DEFAULT):
+    """Queue ``build(obj, *args)`` to run on a freshly fetched ``obj`` and send the result."""
+    if isinstance(obj, ComplaintEscalation):
+        fetch = _fetch_escalation_for_email
+    else:
+        fetch = _fetch_complaint_for_email
+    enqueue_on(tier, _build_and_send, fetch, obj.pk, build, args, fail_silently)
+
+
+def _queue_messages(messages, fail_silently=False):
+    """Hand EmailMessages to the background pool; they share one SMTP connection."""
+    if messages:
+        enqueue(
+            send_messages_task, messages,
+            fail_silently=fail_silently, on_unsent=_release_unsent,
+        )
+
+
 def send_email(subject, message, recipient):
-    """Generic email sender used by all notification helpers."""
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [recipient],
-        fail_silently=False,
-    )
+    """Queue a one-off email to a single recipient."""
+    email = EmailMessage(subject, message, _FROM, [recipient])
+    if _first_send(email):
+        _queue_messages([email])
+
+
+def _email_of(staff):
+    """Email address of an Officer/Worker, or '' when there is none."""
+    return staff.user.email if staff else ''
+
+
+def _citizen_message(subject, message, complaint):
+    return [EmailMessage(subject, message, _FROM, [complaint.user.email])]
 
 
 # ---------------------------------------------------------------------------
 # Complaint Creation Notification
 # ---------------------------------------------------------------------------
 
-def send_complaint_created_email(complaint):
-    """Send confirmation email to citizen when a new complaint is registered."""
-    try:
-        subject = f"Complaint Registered | ID: {complaint.id}"
-        message = f"""Hello {complaint.user.first_name or complaint.user.username},
-
-Your complaint has been successfully registered.
+def _complaint_created_messages(complaint):
+    subject = f"Complaint Registered | ID: {complaint.id}"
+    message = _render("complaint_created.txt", complaint=complaint)
+    return _citizen_message(subject, message, complaint)
 
-Title: {complaint.title}
-Department: {complaint.department.name if complaint.department else 'Being assigned'}
-Status: Submitted
 
-We will keep you updated on progress.
-
-– CivicSaathi
-"""
-        send_email(subject, message, complaint.user.email)
-        return True
-    except Exception as e:
-        print(f"Error sending complaint created email: {e}")
-        return False
+def send_complaint_created_email(complaint):
+    """Send confirmation email to citizen when a new complaint is registered."""
+    _send_later(_complaint_created_messages, complaint)
 
 
 # ---------------------------------------------------------------------------
 # Upvote Notification
 # ---------------------------------------------------------------------------
 
-def send_complaint_upvoted_email(complaint):
-    """Notify the original complainant when their complaint receives a new upvote."""
-    try:
-        subject = "Your Complaint Received New Support"
-        message = f"""Hello {complaint.user.first_name or complaint.user.username},
+def _complaint_upvoted_messages(complaint):
+    subject = "Your Complaint Received New Support"
+    message = _render("complaint_upvoted.txt", complaint=complaint)
+    return _citizen_message(subject, message, complaint)
 
-Your complaint "{complaint.title}" has received a new upvote.
-This increases its priority for faster resolution.
 
-Current Upvotes: {complaint.upvote_count}
+def send_complaint_upvoted_email(complaint):
+    """Notify the original complainant when their complaint receives a new upvote.
 
-– CivicSaathi
-"""
-        send_email(subject, message, complaint.user.email)
-        return True
-    except Exception as e:
-        print(f"Error sending upvote email: {e}")
-        return False
+    Rate-limited to one email per complaint per hour so a burst of upvotes
+    does not flood the citizen's inbox.
+    """
+    key = f"upvote-email:{complaint.pk}:{complaint.user_id}"
+    if not cache.add(key, 1, timeout=_UPVOTE_EMAIL_INTERVAL):
+        return
+    _send_later(_complaint_upvoted_messages, complaint, tier=EMAIL_BULK)
 
 
 # ---------------------------------------------------------------------------
 # Worker Assignment Notification (citizen-facing)
 # ---------------------------------------------------------------------------
 
-def send_worker_assigned_email(complaint):
-    """Notify the citizen that a worker has been assigned to their complaint."""
-    try:
-        subject = "Worker Assigned to Your Complaint"
-        message = f"""Hello {complaint.user.first_name or complaint.user.username},
-
-A worker has been assigned to your complaint.
+def _worker_assigned_messages(complaint):
+    subject = "Worker Assigned to Your Complaint"
+    message = _render("worker_assigned.txt", complaint=complaint)
+    return _citizen_message(subject, message, complaint)
 
-Complaint: {complaint.title}
-Department: {complaint.department.name if complaint.department else 'N/A'}
-Current Status: Assigned
 
-Work will begin shortly.
-
-– CivicSaathi
-"""
-        send_email(subject, message, complaint.user.email)
-        return True
-    except Exception as e:
-        print(f"Error sending worker assigned email: {e}")
-        return False
+def send_worker_assigned_email(complaint):
+    """Notify the citizen that a worker has been assigned to their complaint."""
+    _send_later(_worker_assigned_messages, complaint)
 
 
 # ---------------------------------------------------------------------------
 # Overdue / SLA Breach Notification (citizen-facing)
 # ---------------------------------------------------------------------------
 
-def send_overdue_email(complaint):
-    """Notify the citizen that their complaint has breached its SLA deadline."""
-    try:
-        subject = "Delay Notice: Complaint Escalated"
-        message = f"""Hello {complaint.user.first_name or complaint.user.username},
-
-Your complaint "{complaint.title}" has crossed its expected resolution time.
-The issue has been escalated to senior authorities for immediate action.
+def _overdue_messages(complaint):
+    subject = "Delay Notice: Complaint Escalated"
+    message = _render("overdue.txt", complaint=complaint)
+    return _citizen_message(subject, message, complaint)
 
-We apologize for the delay.
 
-– CivicSaathi
-"""
-        send_email(subject, message, complaint.user.email)
-        return True
-    except Exception as e:
-        print(f"Error sending overdue email: {e}")
-        return False
+def send_overdue_email(complaint):
+    """Notify the citizen that their complaint has breached its SLA deadline."""
+    _send_later(_overdue_messages, complaint, tier=EMAIL_URGENT)
 
 
 # ---------------------------------------------------------------------------
 # Completion Notification
 # ---------------------------------------------------------------------------
 
+def _completion_messages(complaint):
+    subject = "Complaint Successfully Resolved"
+    completed_on = complaint.completed_at
+    completed_on_str = f'{completed_on:%Y-%m-%d %H:%M}' if completed_on else 'N/A'
+    message = _render(
+        "completion.txt", complaint=complaint, completed_on=completed_on_str
+    )
+    return _citizen_message(subject, message, complaint)
+
+
 def send_completion_email(complaint):
     """Notify the citizen that their complaint has been successfully resolved."""
-    try:
-        subject = "Complaint Successfully Resolved"
-        completed_on = complaint.completed_at or complaint.resolved_at
-        completed_on_str = completed_on.strftime('%Y-%m-%d %H:%M') if completed_on else 'N/A'
-        message = f"""Hello {complaint.user.first_name or complaint.user.username},
+    _send_later(_completion_messages, complaint)
 
-Your complaint has been successfully resolved.
 
-Complaint: {complaint.title}
-Completed On: {completed_on_str}
+# ---------------------------------------------------------------------------
+# Worker Assignment Notification (worker-facing — Multi-Channel Alert)
+# ---------------------------------------------------------------------------
 
-Thank you for helping improve the city.
+def _worker_new_assignment_messages(complaint, worker_id):
+    worker = Worker.objects.select_related('user').get(pk=worker_id)
+    if not worker.user.email:
+        return []
 
-– CivicSaathi
-"""
-        send_email(subject, message, complaint.user.email)
-        return True
-    except Exception as e:
-        print(f"Error sending completion email: {e}")
-        return False
+    sla_str = (
+        f'{complaint.sla_deadline:%d %b %Y, %H:%M}'
+        if complaint.sla_deadline else 'Not set'
+    )
 
+    subject = f"🔔 New Complaint Assigned — #{complaint.id}"
+    message = _render(
+        "worker_new_assignment.txt",
+        complaint=complaint,
+        worker=worker,
+        sla_deadline=sla_str,
+        site_url=_SITE_URL,
+    )
+
+    return [EmailMessage(subject, message, _FROM, [worker.user.email])]
 
-# ---------------------------------------------------------------------------
-# Worker Assignment Notification (worker-facing — Multi-Channel Alert)
-# ---------------------------------------------------------------------------
 
 def send_worker_new_assignment_email(complaint, worker):
     """Send a detailed assignment notification email to the worker.
@@ -163,391 +265,302 @@ def send_worker_new_assignment_email(complaint, worker):
     Part of the Multi-Channel Worker Alert System.  Triggered automatically
     when the Automated Assignment Layer allocates a complaint to a worker.
     """
-    try:
-        if not worker or not worker.user.email:
-            return False
-
-        sla_str = (
-            complaint.sla_deadline.strftime('%d %b %Y, %H:%M')
-            if complaint.sla_deadline else 'Not set'
-        )
-        department_name = complaint.department.name if complaint.department else 'N/A'
-        office_name = complaint.office.name if complaint.office else 'N/A'
-        dashboard_link = f"{settings.SITE_URL}/worker/complaint/{complaint.id}"
-
-        subject = f"🔔 New Complaint Assigned — #{complaint.id}"
-        message = (
-            f"Hello {worker.user.first_name or worker.user.username},\n\n"
-            f"A new complaint has been assigned to you.\n\n"
-            f"Complaint Title : {complaint.title}\n"
-            f"Complaint ID    : #{complaint.id}\n"
-            f"Location        : {complaint.location}, {complaint.city}\n"
-            f"Department      : {department_name}\n"
-            f"Office          : {office_name}\n"
-            f"SLA Deadline    : {sla_str}\n\n"
-            f"View on Dashboard: {dashboard_link}\n\n"
-            f"Please log in to your worker dashboard and take action before the SLA deadline.\n\n"
-            f"– CivicSaathi\n"
-        )
-
-        send_email(subject, message, worker.user.email)
-        return True
-    except Exception as e:
-        print(f"Error sending worker new-assignment email: {e}")
-        return False
+    if not worker:
+        return
+    _send_later(_worker_new_assignment_messages, complaint, worker.pk)
 
 
 # ---------------------------------------------------------------------------
 # Legacy / extended functions (worker/officer notifications)
 # ---------------------------------------------------------------------------
 
+def _officer_emails_by_department(department_ids):
+    """Map department id → officer email addresses, fetched in one query."""
+    emails = {}
+    officers = (
+        Officer.objects.filter(department_id__in=department_ids)
+        .exclude(user__email='')
+        .values_list('department_id', 'user__email')
+    )
+    for department_id, email in officers:
+        emails.setdefault(department_id, []).append(email)
+    return emails
+
+
+def _complaint_registered_messages(complaint, officer_emails=None):
+    """Citizen confirmation plus, if the department has officers, their alert."""
+    if officer_emails is None:
+        officer_emails = []
+        if complaint.department_id:
+            officer_emails = _officer_emails_by_department(
+                [complaint.department_id]
+            ).get(complaint.department_id, [])
+
+    subject = f"Complaint Registered - #{complaint.id}"
+    tracking_id = complaint.tracking_id
+
+    # Email to citizen
+    citizen_message = _render(
+        "complaint_registered.txt", complaint=complaint, tracking_id=tracking_id
+    )
+
+    messages = [EmailMessage(
+        subject,
+        citizen_message,
+        _FROM,
+        [complaint.user.email],
+    )]
+
+    # Email to department officers if department assigned
+    if complaint.department and officer_emails:
+        officer_message = _render(
+            "complaint_registered_officer.txt",
+            complaint=complaint,
+            tracking_id=tracking_id,
+            site_url=_SITE_URL,
+        )
+
+        messages.append(EmailMessage(
+            f"New Complaint - {complaint.title}",
+            officer_message,
+            _FROM,
+            officer_emails,
+        ))
+    return messages
+
+
 def send_complaint_registered_email(complaint):
     """Send email when a new complaint is registered"""
-    try:
-        subject = f"Complaint Registered - #{complaint.id}"
-        
-        # Email to citizen
-        citizen_message = f"""
-        Dear {complaint.user.first_name or complaint.user.username},
-        
-        Your complaint has been successfully registered.
-        
-        Complaint Details:
-        - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-        - Title: {complaint.title}
-        - Department: {complaint.department.name if complaint.department else 'Being assigned'}
-        - Status: {complaint.get_status_display()}
-        - Priority: {complaint.priority}
-        
-        Description:
-        {complaint.description}
-        
-        You can track your complaint status through our portal.
-        
-        Thank you for helping improve our community!
-        
-        Municipal Governance Team
-        """
-        
-        send_mail(
-            subject,
-            citizen_message,
-            settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-            [complaint.user.email],
-            fail_silently=True,
-        )
-        
-        # Email to department officer if department assigned
-        if complaint.department:
-            officers = complaint.department.officer_set.all()
-            if officers.exists():
-                officer_emails = [officer.user.email for officer in officers if officer.user.email]
-                if officer_emails:
-                    officer_message = f"""
-                    New complaint assigned to {complaint.department.name} department.
-                    
-                    Complaint Details:
-                    - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-                    - Title: {complaint.title}
-                    - Location: {complaint.location}
-                    - Priority: {complaint.priority}
-                    - Filed by: {complaint.user.get_full_name() or complaint.user.username}
-                    
-                    Please review and assign to appropriate worker.
-                    
-                    Login to admin panel: {settings.SITE_URL if hasattr(settings, 'SITE_URL') else 'http://localhost:8000'}/admin/
-                    """
-                    
-                    send_mail(
-                        f"New Complaint - {complaint.title}",
-                        officer_message,
-                        settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-                        officer_emails,
-                        fail_silently=True,
-                    )
-        
-        return True
-    except Exception as e:
-        print(f"Error sending complaint registered email: {e}")
-        return False
+    _send_later(_complaint_registered_messages, complaint, fail_silently=True)
+
+
+def _send_complaints_registered_bulk(complaint_ids):
+    complaints = list(
+        Complaint.objects.filter(pk__in=complaint_ids)
+        .select_related('user', 'department')
+        .order_by('pk')
+    )
+    officer_emails = _officer_emails_by_department(
+        {c.department_id for c in complaints if c.department_id}
+    )
+
+    messages = []
+    for complaint in complaints:
+        try:
+            messages += _complaint_registered_messages(
+                complaint, officer_emails.get(complaint.department_id, [])
+            )
+        except Exception:
+            logger.exception("_complaint_registered_messages(%s) failed", complaint.pk)
+    messages = [m for m in messages if _first_send(m)]
+    if messages:
+        send_messages_task(messages, fail_silently=True, on_unsent=_release_unsent)
+
+
+def send_complaints_registered_bulk(complaints):
+    """Send registration emails for many complaints over one SMTP session.
+
+    Complaints are re-fetched with ``user`` and ``department`` joined, and
+    officer addresses for every department involved come from one query.
+    """
+    enqueue_on(EMAIL_BULK, _send_complaints_registered_bulk, [c.pk for c in complaints])
+
+
+def _worker_assignment_messages(complaint, worker_id, officer_id):
+    worker = Worker.objects.select_related('user').get(pk=worker_id)
+    if not worker.user.email:
+        return []
+    officer = (
+        Officer.objects.select_related('user').get(pk=officer_id)
+        if officer_id else None
+    )
+
+    subject = f"New Task Assigned - Complaint #{complaint.id}"
+
+    message = _render(
+        "worker_assignment.txt",
+        complaint=complaint,
+        worker=worker,
+        officer=officer,
+        tracking_id=complaint.tracking_id,
+        site_url=_SITE_URL,
+    )
+
+    return [EmailMessage(
+        subject,
+        message,
+        _FROM,
+        [worker.user.email],
+    )]
 
 
 def send_worker_assignment_email(complaint, worker, officer):
     """Send email when a complaint is assigned to a worker"""
-    try:
-        if not worker or not worker.user.email:
-            return False
-        
-        subject = f"New Task Assigned - Complaint #{complaint.id}"
-        
-        message = f"""
-        Dear {worker.user.first_name or worker.user.username},
-        
-        A new complaint has been assigned to you by {officer.user.get_full_name() or officer.user.username}.
-        
-        Complaint Details:
-        - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-        - Title: {complaint.title}
-        - Location: {complaint.location}, {complaint.city}
-        - Priority: {'High' if complaint.priority >= 2 else 'Normal'}
-        - Status: {complaint.get_status_display()}
-        
-        Description:
-        {complaint.description}
-        
-        Please login to the admin panel to view complete details and update the status.
-        
-        Admin Panel: {settings.SITE_URL if hasattr(settings, 'SITE_URL') else 'http://localhost:8000'}/admin/
-        
-        Thank you for your service!
-        
-        Municipal Team
-        """
-        
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-            [worker.user.email],
-            fail_silently=True,
-        )
-        
-        return True
-    except Exception as e:
-        print(f"Error sending worker assignment email: {e}")
-        return False
+    if not worker:
+        return
+    _send_later(
+        _worker_assignment_messages, complaint, worker.pk,
+        officer.pk if officer else None, fail_silently=True,
+    )
+
+
+def _status_update_messages(complaint, old_status, new_status):
+    citizen_email = complaint.user.email
+    if not citizen_email:
+        return []
+
+    subject = f"Complaint Status Updated - #{complaint.id}"
+
+    message = _render(
+        "status_update.txt",
+        complaint=complaint,
+        tracking_id=complaint.tracking_id,
+        old_status=old_status,
+        new_status=new_status,
+    )
+
+    return [EmailMessage(
+        subject,
+        message,
+        _FROM,
+        [citizen_email],
+    )]
 
 
 def send_status_update_email(complaint, old_status, new_status):
     """Send email when complaint status is updated"""
-    try:
-        if not complaint.user.email:
-            return False
-        
-        subject = f"Complaint Status Updated - #{complaint.id}"
-        
-        message = f"""
-        Dear {complaint.user.first_name or complaint.user.username},
-        
-        Your complaint status has been updated.
-        
-        Complaint Details:
-        - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-        - Title: {complaint.title}
-        - Previous Status: {old_status}
-        - New Status: {new_status}
-        
-        """
-        
-        if new_status == 'RESOLVED' or new_status == 'COMPLETED':
-            message += f"""
-        Your complaint has been resolved. If the issue persists, please file a new complaint.
-        
-        We appreciate your patience and cooperation in helping us improve our services.
-            """
-        elif new_status == 'IN_PROGRESS':
-            message += f"""
-        Our team is actively working on resolving your complaint. You will be notified once it's completed.
-            """
-        
-        message += """
-        
-        You can track your complaint status through our portal.
-        
-        Thank you!
-        
-        Municipal Governance Team
-        """
-        
-        send_mail(
+    _send_later(
+        _status_update_messages, complaint, old_status, new_status,
+        fail_silently=True, tier=EMAIL_BULK,
+    )
+
+
+def _escalation_messages(escalation):
+    messages = []
+    complaint = escalation.complaint
+    tracking_id = complaint.tracking_id
+    officer_email = _email_of(escalation.escalated_to)
+    citizen_email = complaint.user.email
+    worker = complaint.current_worker
+    worker_email = _email_of(worker)
+
+    # Email to the officer receiving the escalation
+    if officer_email:
+        subject = f"URGENT: Complaint Escalated - #{complaint.id}"
+
+        message = _render(
+            "escalation_officer.txt",
+            complaint=complaint,
+            escalation=escalation,
+            tracking_id=tracking_id,
+            filed_on=f'{complaint.created_at:%Y-%m-%d %H:%M}',
+            escalated_at=f'{escalation.escalated_at:%Y-%m-%d %H:%M}',
+            site_url=_SITE_URL,
+        )
+
+        messages.append(EmailMessage(
             subject,
             message,
-            settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-            [complaint.user.email],
-            fail_silently=True,
+            _FROM,
+            [officer_email],
+        ))
+
+    # Email to citizen about escalation
+    if citizen_email:
+        subject = f"Your Complaint Has Been Escalated - #{complaint.id}"
+
+        citizen_message = _render(
+            "escalation_citizen.txt",
+            complaint=complaint,
+            escalation=escalation,
+            tracking_id=tracking_id,
+        )
+
+        messages.append(EmailMessage(
+            subject,
+            citizen_message,
+            _FROM,
+            [citizen_email],
+        ))
+
+    # Email to the worker who didn't complete the task (if applicable)
+    if worker_email:
+        subject = f"Complaint Escalated - Performance Notice"
+
+        worker_message = _render(
+            "escalation_worker.txt",
+            complaint=complaint,
+            escalation=escalation,
+            worker=worker,
+            tracking_id=tracking_id,
+            assigned_on=f'{complaint.updated_at:%Y-%m-%d}',
         )
-        
-        return True
-    except Exception as e:
-        print(f"Error sending status update email: {e}")
-        return False
+
+        messages.append(EmailMessage(
+            subject,
+            worker_message,
+            _FROM,
+            [worker_email],
+        ))
+
+    return messages
 
 
 def send_escalation_email(escalation):
     """Send email when a complaint is escalated"""
-    try:
-        complaint = escalation.complaint
-        
-        # Email to the officer receiving the escalation
-        if escalation.escalated_to and escalation.escalated_to.user.email:
-            subject = f"URGENT: Complaint Escalated - #{complaint.id}"
-            
-            message = f"""
-            ESCALATION ALERT
-            
-            A complaint has been escalated to your attention.
-            
-            Complaint Details:
-            - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-            - Title: {complaint.title}
-            - Location: {complaint.location}, {complaint.city}
-            - Priority: {complaint.priority}
-            - Status: {complaint.get_status_display()}
-            - Filed on: {complaint.created_at.strftime('%Y-%m-%d %H:%M')}
-            
-            Escalation Details:
-            - Reason: {escalation.reason}
-            - Escalated by: {escalation.escalated_from.user.get_full_name() if escalation.escalated_from else 'System'}
-            - Escalated at: {escalation.escalated_at.strftime('%Y-%m-%d %H:%M')}
-            
-            Previously assigned to:
-            - Worker: {complaint.current_worker.user.get_full_name() if complaint.current_worker else 'Not assigned'}
-            - Officer: {complaint.current_officer.user.get_full_name() if complaint.current_officer else 'Not assigned'}
-            
-            Description:
-            {complaint.description}
-            
-            IMMEDIATE ACTION REQUIRED
-            
-            Please login to the admin panel and take appropriate action.
-            
-            Admin Panel: {settings.SITE_URL if hasattr(settings, 'SITE_URL') else 'http://localhost:8000'}/admin/
-            
-            Municipal Governance System
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-                [escalation.escalated_to.user.email],
-                fail_silently=True,
-            )
-        
-        # Email to citizen about escalation
-        if complaint.user.email:
-            subject = f"Your Complaint Has Been Escalated - #{complaint.id}"
-            
-            citizen_message = f"""
-            Dear {complaint.user.first_name or complaint.user.username},
-            
-            Your complaint has been escalated to senior authorities for priority handling.
-            
-            Complaint Details:
-            - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-            - Title: {complaint.title}
-            - Escalation Reason: {escalation.reason}
-            
-            We are committed to resolving your issue as quickly as possible. A senior officer is now overseeing your complaint.
-            
-            Thank you for your patience.
-            
-            Municipal Governance Team
-            """
-            
-            send_mail(
-                subject,
-                citizen_message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-                [complaint.user.email],
-                fail_silently=True,
-            )
-        
-        # Email to the worker who didn't complete the task (if applicable)
-        if complaint.current_worker and complaint.current_worker.user.email:
-            subject = f"Complaint Escalated - Performance Notice"
-            
-            worker_message = f"""
-            Dear {complaint.current_worker.user.first_name or complaint.current_worker.user.username},
-            
-            A complaint assigned to you has been escalated due to delayed resolution.
-            
-            Complaint Details:
-            - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-            - Title: {complaint.title}
-            - Assigned on: {complaint.updated_at.strftime('%Y-%m-%d')}
-            - Escalation Reason: {escalation.reason}
-            
-            Please note that timely resolution of assigned tasks is important for maintaining service quality.
-            If you face any challenges in completing assignments, please communicate with your supervisor promptly.
-            
-            Municipal Administration
-            """
-            
-            send_mail(
-                subject,
-                worker_message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-                [complaint.current_worker.user.email],
-                fail_silently=True,
-            )
-        
-        return True
-    except Exception as e:
-        print(f"Error sending escalation email: {e}")
-        return False
+    _send_later(
+        _escalation_messages, escalation, fail_silently=True, tier=EMAIL_URGENT
+    )
+
+
+def _sla_warning_messages(complaint, hours_remaining):
+    messages = []
+    tracking_id = complaint.tracking_id
+    worker_email = _email_of(complaint.current_worker)
+    officer_email = _email_of(complaint.current_officer)
+
+    # Email to assigned worker
+    if worker_email:
+        subject = f"SLA Warning - Complaint #{complaint.id} - {hours_remaining}h remaining"
+
+        message = _render(
+            "sla_warning_worker.txt",
+            complaint=complaint,
+            tracking_id=tracking_id,
+            hours_remaining=hours_remaining,
+        )
+
+        messages.append(EmailMessage(
+            subject,
+            message,
+            _FROM,
+            [worker_email],
+        ))
+
+    # Email to supervising officer
+    if officer_email:
+        subject = f"SLA Warning - Complaint #{complaint.id}"
+
+        officer_message = _render(
+            "sla_warning_officer.txt",
+            complaint=complaint,
+            tracking_id=tracking_id,
+            hours_remaining=hours_remaining,
+        )
+
+        messages.append(EmailMessage(
+            subject,
+            officer_message,
+            _FROM,
+            [officer_email],
+        ))
+
+    return messages
 
 
 def send_sla_warning_email(complaint, hours_remaining):
     """Send warning email when complaint is approaching SLA deadline"""
-    try:
-        # Email to assigned worker
-        if complaint.current_worker and complaint.current_worker.user.email:
-            subject = f"SLA Warning - Complaint #{complaint.id} - {hours_remaining}h remaining"
-            
-            message = f"""
-            SLA DEADLINE WARNING
-            
-            A complaint assigned to you is approaching its resolution deadline.
-            
-            Complaint Details:
-            - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-            - Title: {complaint.title}
-            - Location: {complaint.location}
-            - Time Remaining: {hours_remaining} hours
-            
-            Please ensure timely completion to avoid escalation.
-            
-            Municipal Team
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-                [complaint.current_worker.user.email],
-                fail_silently=True,
-            )
-        
-        # Email to supervising officer
-        if complaint.current_officer and complaint.current_officer.user.email:
-            subject = f"SLA Warning - Complaint #{complaint.id}"
-            
-            officer_message = f"""
-            SLA DEADLINE WARNING
-            
-            A complaint under your supervision is approaching its resolution deadline.
-            
-            Complaint Details:
-            - Tracking ID: CMP-{complaint.created_at.year}-{complaint.id:05d}
-            - Title: {complaint.title}
-            - Assigned to: {complaint.current_worker.user.get_full_name() if complaint.current_worker else 'Not assigned'}
-            - Time Remaining: {hours_remaining} hours
-            
-            Please follow up with the assigned worker to ensure timely resolution.
-            
-            Municipal System
-            """
-            
-            send_mail(
-                subject,
-                officer_message,
-                settings.DEFAULT_FROM_EMAIL if hasattr(settings, 'DEFAULT_FROM_EMAIL') else 'noreply@municipal.gov',
-                [complaint.current_officer.user.email],
-                fail_silently=True,
-            )
-        
-        return True
-    except Exception as e:
-        print(f"Error sending SLA warning email: {e}")
-        return False
+    _send_later(
+        _sla_warning_messages, complaint, hours_remaining,
+        fail_silently=True, tier=EMAIL_URGENT,
+    )
@@ -2,9 +2,26 @@
 AI-based Filter System for Complaint Validation
 Checks if photo and description match the category
 """
+from functools import lru_cache
 from typing import Dict, Tuple
 import re
 
+from django.db import transaction
+
+# Promotional wording, link bait, or any character repeated 5+ times in a row.
+# Matched against lower-cased text, so no IGNORECASE.
+_SPAM_RE = re.compile(
+    r'\b(?:buy|purchase|discount|offer|sale|cheap|free|win|prize'
+    r'|click here|visit|website|link)\b'
+    r'|(.)\1{4,}'
+)
+
+
+def _keyword_regex(keywords):
+    """One alternation over ``keywords``, longest first so 'road sign' beats 'road'."""
+    alternatives = sorted(set(keywords), key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, alternatives)))
+
 
 class ComplaintFilterSystem:
     """
@@ -26,26 +43,26 @@ class ComplaintFilterSystem:
     }
     
     @staticmethod
-    def check_description_category_match(description: str, category_name: str) -> Tuple[bool, str]:
+    def check_description_category_match(
+        description: str, category_name: str, description_lower: str = None
+    ) -> Tuple[bool, str]:
         """
         Check if description matches the category
+        Pass description_lower if the caller has already lower-cased it.
         Returns: (is_valid, reason)
         """
-        description_lower = description.lower()
-        category_lower = category_name.lower()
+        if description_lower is None:
+            description_lower = description.lower()
         
-        # Find relevant keywords for this category
-        relevant_keywords = []
-        for key, keywords in ComplaintFilterSystem.CATEGORY_KEYWORDS.items():
-            if key in category_lower:
-                relevant_keywords.extend(keywords)
-        
-        # If no specific keywords, use category name itself
-        if not relevant_keywords:
-            relevant_keywords = [word for word in category_lower.split() if len(word) > 3]
-        
-        # Check if any keyword is in description
-        matches = [kw for kw in relevant_keywords if kw in description_lower]
+        # Check the description against this category's keywords
+        pattern = _category_pattern(category_name.lower())
+        matches = []
+        if pattern:
+            for found in pattern.finditer(description_lower):
+                if found.group() not in matches:
+                    matches.append(found.group())
+                    if len(matches) == 3:
+                        break
         
         if matches:
             return True, f"Valid: Found relevant keywords - {', '.join(matches[:3])}"
@@ -53,25 +70,23 @@ class ComplaintFilterSystem:
             return False, f"Description does not match category '{category_name}'"
     
     @staticmethod
-    def check_spam_content(description: str) -> Tuple[bool, str]:
+    def check_spam_content(description: str, description_lower: str = None) -> Tuple[bool, str]:
         """
         Check if content is spam
+        Pass description_lower if the caller has already lower-cased it.
         Returns: (is_spam, reason)
         """
-        spam_patterns = [
-            r'\b(buy|purchase|discount|offer|sale|cheap|free|win|prize)\b',
-            r'\b(click here|visit|website|link)\b',
-            r'(.)\1{4,}',  # Repeated characters
-        ]
-        
-        for pattern in spam_patterns:
-            if re.search(pattern, description, re.IGNORECASE):
-                return True, "Detected spam pattern in description"
+        if description_lower is None:
+            description_lower = description.lower()
+        stripped = description_lower.strip()
         
         # Check for very short descriptions
-        if len(description.strip()) < 20:
+        if len(stripped) < 20:
             return True, "Description too short (minimum 20 characters)"
         
+        if _SPAM_RE.search(stripped):
+            return True, "Detected spam pattern in description"
+        
         return False, "Content appears genuine"
     
     @staticmethod
@@ -84,8 +99,13 @@ class ComplaintFilterSystem:
             'is_spam': bool
         }
         """
+        # Both checks match against lower-cased text; build it once
+        description_lower = complaint.description.lower()
+
         # Check for spam
-        is_spam, spam_reason = ComplaintFilterSystem.check_spam_content(complaint.description)
+        is_spam, spam_reason = ComplaintFilterSystem.check_spam_content(
+            complaint.description, description_lower
+        )
         if is_spam:
             return {
                 'passed': False,
@@ -97,7 +117,8 @@ class ComplaintFilterSystem:
         if complaint.category:
             is_match, match_reason = ComplaintFilterSystem.check_description_category_match(
                 complaint.description,
-                complaint.category.name
+                complaint.category.name,
+                description_lower,
             )
             
             if not is_match:
@@ -115,6 +136,25 @@ class ComplaintFilterSystem:
         }
 
 
+@lru_cache(maxsize=256)
+def _category_pattern(category_lower):
+    """
+    Compiled keyword pattern for a lower-cased category name, or None.
+
+    Uses the keywords of every CATEGORY_KEYWORDS entry named in the category,
+    falling back to the category's own longer words.
+    """
+    keywords = [
+        keyword
+        for key, keywords in ComplaintFilterSystem.CATEGORY_KEYWORDS.items()
+        if key in category_lower
+        for keyword in keywords
+    ]
+    if not keywords:
+        keywords = [word for word in category_lower.split() if len(word) > 3]
+    return _keyword_regex(keywords) if keywords else None
+
+
 class ComplaintSortingSystem:
     """
     Automated Department Sorting Layer
@@ -138,6 +178,10 @@ class ComplaintSortingSystem:
         """
         Route a verified complaint to the correct municipal department.
 
+        Callers loading the complaint themselves should
+        ``select_related('department', 'category__department')`` so resolving
+        the department costs no extra queries.
+
         Department resolution priority
         ──────────────────────────────
         1. complaint.department  – citizen-selected at submission (preferred)
@@ -145,10 +189,12 @@ class ComplaintSortingSystem:
 
         Side-effects (in order)
         ────────────────────────
-        1. Sets status → SORTING and persists department.
+        1. Sets status → SORTING and pins department (in memory only).
         2. Looks up the active Office for (department, city).
-        3. Sets complaint.office, complaint.sorted = True, status → PENDING.
-        4. Saves only the changed fields to minimise DB writes.
+        3. Attempts worker assignment.
+        4. Sets complaint.sorted = True (status → PENDING if no worker) and
+           saves department, office, sorted and status in one UPDATE.
+        All writes happen in one transaction.
 
         Returns
         ───────
@@ -166,7 +212,7 @@ class ComplaintSortingSystem:
             department = complaint.department
 
         # Fall back to the department linked to the complaint's category.
-        if department is None and complaint.category_id and complaint.category:
+        if department is None and complaint.category_id:
             department = complaint.category.department
 
         if department is None:
@@ -181,29 +227,36 @@ class ComplaintSortingSystem:
             }
 
         # ── Step 2: Mark as SORTING; pin the resolved department ─────────────
+        # Persisted together with the final sort below; nothing outside this
+        # function observes the intermediate SORTING state.
         complaint.department = department
         complaint.status = 'SORTING'
-        complaint.save(update_fields=['department', 'status', 'updated_at'])
-
-        # ── Steps 3 & 4: Sorting Layer B – office routing ───────────────────
-        # Delegate to apply_office_sorting() to find and attach the correct
-        # municipal office for this (department, city) pair.
-        office_result = ComplaintSortingSystem.apply_office_sorting(complaint)
-        office = office_result['office']
-
-        # ── Step 5: Worker Assignment Layer ─────────────────────────────────
-        # Attempt automated worker assignment now that department + office are
-        # both resolved.
-        assignment_result = WorkerAssignmentLayer.assign_worker(complaint)
-
-        # Finalise sort: mark sorted=True.
-        # • If a worker was auto-assigned, complaint.status is already 'ASSIGNED'
-        #   (set inside assign_worker); just persist sorted=True.
-        # • If no worker could be found, drop back to PENDING for manual routing.
-        complaint.sorted = True
-        if not assignment_result['success']:
-            complaint.status = 'PENDING'
-        complaint.save(update_fields=['sorted', 'status', 'updated_at'])
+
+        with transaction.atomic():
+            # ── Steps 3 & 4: Sorting Layer B – office routing ───────────────
+            # Delegate to apply_office_sorting() to find and attach the correct
+            # municipal office for this (department, city) pair; it is saved
+            # with the final sort below.
+            office_result = ComplaintSortingSystem.apply_office_sorting(
+                complaint, persist=False
+            )
+            office = office_result['office']
+
+            # ── Step 5: Worker Assignment Layer ─────────────────────────────
+            # Attempt automated worker assignment now that department + office are
+            # both resolved.
+            assignment_result = WorkerAssignmentLayer.assign_worker(complaint)
+
+            # Finalise sort: mark sorted=True.
+            # • If a worker was auto-assigned, complaint.status is already 'ASSIGNED'
+            #   (set inside assign_worker); just persist sorted=True.
+            # • If no worker could be found, drop back to PENDING for manual routing.
+            complaint.sorted = True
+            if not assignment_result['success']:
+                complaint.status = 'PENDING'
+            complaint.save(update_fields=[
+                'department', 'office', 'sorted', 'status', 'updated_at'
+            ])
 
         office_info = f", office '{office.name}'" if office else " (no active office registered for this city — manual assignment required)"
         assignment_info = (
@@ -222,12 +275,26 @@ class ComplaintSortingSystem:
             ),
         }
 
+    @staticmethod
+    def sort_complaints_bulk(complaints):
+        """
+        Run sort_complaint() over a Complaint queryset.
+
+        Departments and category departments are joined into the one query
+        that loads the complaints, so resolving them costs nothing per row.
+        Returns the sort_complaint() result dicts in queryset order.
+        """
+        return [
+            ComplaintSortingSystem.sort_complaint(complaint)
+            for complaint in complaints.select_related('department', 'category__department')
+        ]
+
     # ─────────────────────────────────────────────────────────────────────────
     # Sorting Layer B — Office Routing
     # ─────────────────────────────────────────────────────────────────────────
 
     @staticmethod
-    def apply_office_sorting(complaint):
+    def apply_office_sorting(complaint, persist=True):
         """
         Sorting Layer B: Automated Office Routing.
 
@@ -248,7 +315,8 @@ class ComplaintSortingSystem:
         Side-effects
         ────────────
         • Sets complaint.office if a matching active office is found.
-        • Saves only the 'office' field to minimise DB writes.
+        • Saves only the 'office' field to minimise DB writes, unless
+          persist=False, in which case the caller saves it.
         • Does NOT change status or sorted flag — that is the caller's
           responsibility (sort_complaint handles those transitions).
 
@@ -284,30 +352,22 @@ class ComplaintSortingSystem:
                 ),
             }
 
-        office = None
-        try:
-            office = Office.objects.get(
-                department=complaint.department,
+        # Earliest registered active office wins if the city is listed twice
+        # (e.g. 'Jaipur' and 'jaipur'); None if there is no office yet.
+        office = (
+            Office.objects.filter(
+                department_id=complaint.department_id,
                 city__iexact=complaint.city,
                 is_active=True,
             )
-        except Office.DoesNotExist:
-            pass  # No active office in this city for the department yet
-        except Office.MultipleObjectsReturned:
-            # More than one active office — pick the earliest registered one.
-            office = (
-                Office.objects.filter(
-                    department=complaint.department,
-                    city__iexact=complaint.city,
-                    is_active=True,
-                )
-                .order_by('id')
-                .first()
-            )
+            .order_by('id')
+            .first()
+        )
 
         if office:
             complaint.office = office
-            complaint.save(update_fields=['office', 'updated_at'])
+            if persist:
+                complaint.save(update_fields=['office', 'updated_at'])
             return {
                 'success': True,
                 'office': office,
@@ -532,7 +592,7 @@ class ComplaintAssignmentSystem:
         this method only updates location metadata when it differs from what was
         saved at submission time.
         """
-        changed_fields = ['updated_at']
+        changed_fields = []
 
         if complaint.city != city:
             complaint.city = city
@@ -542,5 +602,7 @@ class ComplaintAssignmentSystem:
             complaint.state = state
             changed_fields.append('state')
 
-        complaint.save(update_fields=changed_fields)
+        # Nothing to write when the submission already had this location
+        if changed_fields:
+            complaint.save(update_fields=changed_fields + ['updated_at'])
         return True
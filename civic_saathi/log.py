@@ -0,0 +1,67 @@
+"""
+Logging helpers for CivicSaathi (wired up in settings.LOGGING).
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thin out repeated exception tracebacks.
+
+    The first ``burst`` records for each (logger, exception type) pair pass
+    through, then only one in every ``rate``.  Records without an exception
+    are never dropped.
+    """
+
+    def __init__(self, burst=10, rate=100):
+        super().__init__()
+        self.burst = burst
+        self.rate = rate
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not record.exc_info or record.exc_info[0] is None:
+            return True
+        key = (record.name, record.exc_info[0].__name__)
+        with self._lock:
+            count = self._counts[key] = self._counts.get(key, 0) + 1
+        return count <= self.burst or count % self.rate == 0
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queue records for a listener thread that writes them to stderr.
+
+    The calling thread only formats the record; the blocking write happens
+    on the listener, so a burst of errors cannot stall request threads.
+
+    The listener is started by the first record each process emits, not
+    when logging is configured: with ``gunicorn --preload`` logging is set
+    up in the master, and forked workers do not inherit its thread.
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self.listener = None
+        self._pid = None
+
+    def emit(self, record):
+        # Handler.handle() already holds self.lock, which logging re-creates
+        # in a forked child, so this check-and-start cannot race
+        if self._pid != os.getpid():
+            self._start_listener()
+        super().emit(record)
+
+    def _start_listener(self):
+        # A fresh queue, so a child never replays records copied from its parent
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, logging.StreamHandler())
+        self.listener.start()
+        atexit.register(self.listener.stop)
+        self._pid = os.getpid()
@@ -103,7 +103,7 @@ class Command(BaseCommand):
                         old_priority = complaint.priority
                         complaint.status = 'PENDING'  # Reset to pending for reassignment
                         complaint.priority = max(complaint.priority + 1, 3)  # Increase priority, max 3
-                        complaint.save()
+                        complaint.save(update_fields=['status', 'priority', 'updated_at'])
                         
                         # Create log entry
                         ComplaintLog.objects.create(
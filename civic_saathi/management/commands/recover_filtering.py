@@ -0,0 +1,71 @@
+"""
+Management command to finish Filter B for complaints stuck in FILTERING.
+
+Complaints with a photo are classified in the background after submission;
+if the worker process restarts before that finishes, the complaint is never
+sorted.  Run this periodically (e.g., every 10 minutes) via cron.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from civic_saathi.ai_filter import classify_complaints_batch
+from civic_saathi.models import Complaint
+from civic_saathi.views_api import apply_filter_b
+
+
+class Command(BaseCommand):
+    help = 'Re-run Filter B on complaints left in FILTERING by a worker restart'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show which complaints would be re-checked without changing them',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=10,
+            help='Minutes a complaint must have been in FILTERING (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        cutoff = timezone.now() - timedelta(minutes=options['stale_minutes'])
+
+        stuck = list(Complaint.objects.filter(
+            status='FILTERING',
+            is_deleted=False,
+            updated_at__lt=cutoff,
+        ).exclude(
+            Q(image='') | Q(image__isnull=True)
+        ).select_related('user', 'department', 'category__department'))
+
+        if dry_run:
+            for complaint in stuck:
+                self.stdout.write(
+                    self.style.NOTICE(f'  [DRY RUN] Would re-check complaint #{complaint.id}')
+                )
+        else:
+            # One concurrent Gemini round for the whole backlog
+            results = classify_complaints_batch(
+                (complaint.image.path, complaint.description) for complaint in stuck
+            )
+            for complaint, result in zip(stuck, results):
+                apply_filter_b(complaint, lambda result=result: _unwrap(result))
+                self.stdout.write(
+                    self.style.SUCCESS(f'  ✓ Complaint #{complaint.id} → {complaint.status}')
+                )
+
+        verb = 'Would re-check' if dry_run else 'Re-checked'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(stuck)} complaints stuck in FILTERING'))
+
+
+def _unwrap(result):
+    """Batch results hold the exception in place of a failed classification."""
+    if isinstance(result, BaseException):
+        raise result
+    return result
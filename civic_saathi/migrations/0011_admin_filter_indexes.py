@@ -0,0 +1,33 @@
+# Generated by Django 4.2.28 on 2026-10-16 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civic_saathi', '0010_dynamic_sla_priority_intelligence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['department', 'status'], name='civic_saath_departm_5e6d8a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['-is_emergency', '-priority', '-created_at'], name='civic_saath_is_emer_736c3a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['is_spam', 'is_deleted'], name='civic_saath_is_spam_dce32d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaintescalation',
+            index=models.Index(fields=['escalated_at'], name='civic_saath_escalat_cb566e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workerattendance',
+            index=models.Index(fields=['date', 'worker'], name='civic_saath_date_a7bdd8_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-16 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civic_saathi', '0011_admin_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(condition=models.Q(('is_deleted', False), ('status__in', ['SUBMITTED', 'FILTERING', 'VERIFIED', 'SORTING', 'PENDING', 'ASSIGNED', 'IN_PROGRESS', 'PENDING_VERIFICATION'])), fields=['smart_hash'], name='active_smarthash_idx'),
+        ),
+    ]
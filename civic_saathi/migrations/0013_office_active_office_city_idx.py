@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-16 13:08
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civic_saathi', '0012_complaint_active_smarthash_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='office',
+            index=models.Index(models.F('department'), django.db.models.functions.text.Upper('city'), condition=models.Q(('is_active', True)), name='active_office_city_idx'),
+        ),
+    ]
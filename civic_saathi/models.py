@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.core.validators import RegexValidator
+from django.utils.functional import cached_property
+
+from .duplicate_detection import ACTIVE_STATUSES
 
 
 # -------------------------
@@ -149,6 +154,14 @@ class Office(models.Model):
     
     class Meta:
         unique_together = ('department', 'city')
+        indexes = [
+            # Office routing matches city case-insensitively (city__iexact)
+            models.Index(
+                F('department'), Upper('city'),
+                name='active_office_city_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.city}"
@@ -309,8 +322,22 @@ class Complaint(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     sla_deadline = models.DateTimeField(null=True, blank=True, help_text="Service Level Agreement deadline")
 
+    class Meta:
+        indexes = [
+            # Admin changelist filters and default ordering
+            models.Index(fields=['department', 'status']),
+            models.Index(fields=['-is_emergency', '-priority', '-created_at']),
+            models.Index(fields=['is_spam', 'is_deleted']),
+            # Duplicate lookup: only live, active complaints are indexed
+            models.Index(
+                fields=['smart_hash'],
+                name='active_smarthash_idx',
+                condition=models.Q(is_deleted=False) & models.Q(status__in=ACTIVE_STATUSES),
+            ),
+        ]
+
     def save(self, *args, **kwargs):
-        if self.category and not self.department:
+        if self.category_id and not self.department_id:
             self.department = self.category.department
         # Effective priority = max(AI-determined base, vote-boosted value)
         vote_priority = 1 + (self.upvote_count // 10)
@@ -326,6 +353,11 @@ class Complaint(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.status})"
+
+    @cached_property
+    def tracking_id(self):
+        """Citizen-facing reference, e.g. ``CMP-2026-00042``."""
+        return "CMP-%d-%05d" % (self.created_at.year, self.id)
         
 
 # -------------------------
@@ -398,6 +430,11 @@ class ComplaintEscalation(models.Model):
     )
     reason = models.CharField(max_length=255)
     escalated_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['escalated_at']),
+        ]
     
     def __str__(self):
         return f"Escalation for Complaint {self.complaint.id} at {self.escalated_at}"
@@ -461,6 +498,10 @@ class WorkerAttendance(models.Model):
     
     class Meta:
         unique_together = ('worker', 'date')
+        indexes = [
+            # Date-first lookups for the admin date_hierarchy
+            models.Index(fields=['date', 'worker']),
+        ]
     
     def __str__(self):
         return f"{self.worker.user.username} - {self.date} - {self.status}"
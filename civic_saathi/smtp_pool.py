@@ -0,0 +1,124 @@
+"""
+Process-wide pool of open email connections.
+
+Opening an SMTP connection costs a TCP connect, a TLS handshake and an AUTH
+round-trip.  The pool keeps a few authenticated connections alive between
+sends, verifies them with NOOP before reuse and retires each one after a
+fixed number of messages or once it has sat idle long enough for the
+server to have dropped it.
+"""
+import atexit
+import queue
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+
+class PooledConnection:
+    """An open email backend plus its usage so far."""
+    __slots__ = ('key', 'backend', 'messages_sent', 'last_used')
+
+    def __init__(self, key, backend):
+        self.key = key
+        self.backend = backend
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of open email backends, keyed by backend and server.
+
+    ``acquire()`` hands out an idle connection that is still fresh and
+    answers NOOP, or opens a new one; ``release()`` puts it back unless it is
+    worn out or the pool is full, in which case it is closed.
+    """
+
+    def __init__(self, size=5, max_messages=100, max_idle=60):
+        self.size = size
+        self.max_messages = max_messages
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(fail_silently):
+        return (
+            settings.EMAIL_BACKEND,
+            getattr(settings, 'EMAIL_HOST', None),
+            getattr(settings, 'EMAIL_PORT', None),
+            getattr(settings, 'EMAIL_HOST_USER', None),
+            fail_silently,
+        )
+
+    def _queue(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle is None:
+                idle = self._idle[key] = queue.LifoQueue(maxsize=self.size)
+            return idle
+
+    def acquire(self, fail_silently=False):
+        key = self._key(fail_silently)
+        idle = self._queue(key)
+        while True:
+            try:
+                pooled = idle.get_nowait()
+            except queue.Empty:
+                break
+            # Servers close idle sessions; don't spend a NOOP on a stale one
+            if time.monotonic() - pooled.last_used <= self.max_idle and self._healthy(pooled.backend):
+                return pooled
+            self.discard(pooled)
+        backend = get_connection(fail_silently=fail_silently)
+        backend.open()
+        return PooledConnection(key, backend)
+
+    def release(self, pooled):
+        if pooled.messages_sent >= self.max_messages:
+            self.discard(pooled)
+            return
+        pooled.last_used = time.monotonic()
+        try:
+            self._queue(pooled.key).put_nowait(pooled)
+        except queue.Full:
+            self.discard(pooled)
+
+    def discard(self, pooled):
+        try:
+            pooled.backend.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self._lock:
+            queues = list(self._idle.values())
+        for idle in queues:
+            while True:
+                try:
+                    self.discard(idle.get_nowait())
+                except queue.Empty:
+                    break
+
+    @staticmethod
+    def _healthy(backend):
+        # Non-SMTP backends (console, locmem, ...) have nothing to check
+        if not hasattr(backend, 'connection'):
+            return True
+        if backend.connection is None:
+            return False
+        try:
+            return backend.connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+
+pool = SMTPConnectionPool(
+    size=getattr(settings, 'EMAIL_POOL_SIZE', 5),
+    max_messages=getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100),
+    max_idle=getattr(settings, 'EMAIL_POOL_MAX_IDLE', 60),
+)
+atexit.register(pool.close_all)
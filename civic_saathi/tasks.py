@@ -0,0 +1,162 @@
+"""
+Background tasks for CivicSaathi.
+
+Outgoing email is handed to an in-process thread pool so the SMTP round-trip
+never sits on the request/response path.  Jobs are submitted only once the
+surrounding transaction commits, so a rolled-back request sends no mail.
+
+The AI_FILTER pool finishes Filter B for complaints whose Gemini
+classification completed in the background (see views_api).
+"""
+import logging
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .smtp_pool import pool as smtp_pool
+
+logger = logging.getLogger(__name__)
+
+EMAIL_MAX_RETRIES = 5
+EMAIL_RETRY_BACKOFF = 2  # seconds; doubled after every failed attempt
+# Give up on a batch once this share of messages is rejected, but only
+# after enough attempts for the ratio to mean something
+EMAIL_BATCH_MIN_ATTEMPTS = 30
+EMAIL_BATCH_MAX_FAILURE_RATIO = 1 / 3
+
+# The server turning down one particular message, as opposed to the
+# connection failing (every other SMTPException, or an OSError)
+_REJECTIONS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+# Priority tiers.  Each has its own thread pool, so a burst of low-priority
+# notices (upvotes, status changes) cannot hold up overdue, escalation and
+# SLA notices queued behind it.
+EMAIL_DEFAULT = 'email'
+EMAIL_URGENT = 'email_urgent'
+EMAIL_BULK = 'email_bulk'
+AI_FILTER = 'ai_filter'
+
+_executors = {
+    EMAIL_DEFAULT: ThreadPoolExecutor(
+        max_workers=getattr(settings, 'EMAIL_WORKER_THREADS', 4),
+        thread_name_prefix=EMAIL_DEFAULT,
+    ),
+    EMAIL_URGENT: ThreadPoolExecutor(
+        max_workers=getattr(settings, 'EMAIL_URGENT_WORKER_THREADS', 2),
+        thread_name_prefix=EMAIL_URGENT,
+    ),
+    EMAIL_BULK: ThreadPoolExecutor(
+        max_workers=getattr(settings, 'EMAIL_BULK_WORKER_THREADS', 2),
+        thread_name_prefix=EMAIL_BULK,
+    ),
+    AI_FILTER: ThreadPoolExecutor(
+        max_workers=getattr(settings, 'AI_FILTER_WORKER_THREADS', 4),
+        thread_name_prefix=AI_FILTER,
+    ),
+}
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", func.__name__)
+    finally:
+        close_old_connections()
+
+
+def enqueue(func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` on the default email pool after the current transaction commits."""
+    enqueue_on(EMAIL_DEFAULT, func, *args, **kwargs)
+
+
+def enqueue_on(tier, func, *args, **kwargs):
+    """Like ``enqueue`` but on the pool for ``tier`` (one of the names above)."""
+    transaction.on_commit(lambda: run_on(tier, func, *args, **kwargs))
+
+
+def run_on(tier, func, *args, **kwargs):
+    """Submit ``func(*args, **kwargs)`` to the pool for ``tier`` right away."""
+    _executors[tier].submit(_run, func, args, kwargs)
+
+
+def send_messages_task(messages, fail_silently=False, on_unsent=None):
+    """
+    Deliver EmailMessages over a pooled SMTP connection.
+
+    If the connection drops, a fresh one is taken after an exponential
+    backoff and delivery resumes with the first unsent message.  A message
+    the server rejects is logged and skipped; once more than a third of at
+    least EMAIL_BATCH_MIN_ATTEMPTS messages have been rejected the rest of
+    the batch is abandoned rather than piling more load on the server.
+
+    ``on_unsent``, if given, is called with every message that was not
+    delivered: rejected, abandoned, or left over when retries run out.
+    """
+    sent = failed = retries = 0
+    unsent = []
+    i = 0
+    delay = EMAIL_RETRY_BACKOFF
+    pooled = None
+    try:
+        for i, message in enumerate(messages):
+            while True:
+                try:
+                    if pooled is None:
+                        pooled = smtp_pool.acquire(fail_silently)
+                    elif pooled.messages_sent >= smtp_pool.max_messages:
+                        smtp_pool.release(pooled)
+                        pooled = None
+                        pooled = smtp_pool.acquire(fail_silently)
+                    delivered = pooled.backend.send_messages([message])
+                except _REJECTIONS as e:
+                    logger.warning("Server rejected %r: %s", message.subject, e)
+                    delivered = 0
+                except OSError as e:  # includes every other SMTPException
+                    if pooled is not None:
+                        smtp_pool.discard(pooled)
+                        pooled = None
+                    retries += 1
+                    if retries > EMAIL_MAX_RETRIES:
+                        raise
+                    logger.warning(
+                        "Sending %r failed (%s); retrying in %ss",
+                        message.subject, e, delay,
+                    )
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+                break
+            pooled.messages_sent += 1
+            if delivered:
+                sent += 1
+            else:
+                failed += 1
+                unsent.append(message)
+                attempts = sent + failed
+                ratio = failed / attempts
+                if attempts >= EMAIL_BATCH_MIN_ATTEMPTS and ratio > EMAIL_BATCH_MAX_FAILURE_RATIO:
+                    logger.warning(
+                        "Aborting email batch; failure ratio %.2f after %d messages, %d unsent",
+                        ratio, attempts, len(messages) - attempts,
+                    )
+                    unsent += messages[i + 1:]
+                    break
+    except Exception:
+        if pooled is not None:
+            smtp_pool.discard(pooled)
+        if on_unsent:
+            on_unsent(unsent + list(messages[i:]))
+        raise
+    if pooled is not None:
+        smtp_pool.release(pooled)
+    if unsent and on_unsent:
+        on_unsent(unsent)
+    return sent
@@ -8,6 +8,7 @@ from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count
 from django.utils import timezone
 from django.conf import settings
+from django.db import transaction
 from datetime import datetime
 import logging
 
@@ -26,10 +27,11 @@ from .serializers import (
     WorkerSerializer, WorkerAttendanceSerializer, DepartmentAttendanceSerializer, OfficeSerializer
 )
 from .filter_system import ComplaintFilterSystem, ComplaintSortingSystem, ComplaintAssignmentSystem
-from .ai_filter import classify_complaint  # Filter B: AI-assisted visual verification + severity classification
+from .ai_filter import classify_complaint_in_background  # Filter B: AI-assisted visual verification + severity classification
 from .duplicate_detection import generate_smart_hash, generate_candidate_hashes, find_duplicate
 from .permissions import IsAdmin, IsSubAdmin, IsDepartmentAdmin, IsCitizen
 from .admin_auth import AdminTokenAuthentication
+from .tasks import AI_FILTER, run_on
 from .email_service import (
     send_complaint_created_email,
     send_complaint_upvoted_email,
@@ -200,7 +202,7 @@ class ComplaintCreateView(generics.CreateAPIView):
             title, latitude, longitude, dept_name
         )
 
-        # ── Duplicate lookup with neighbor search + Haversine ──────────────
+        # ── Duplicate lookup with neighbor search + distance check ─────────
         existing = find_duplicate(
             smart_hash,
             candidate_hashes=candidate_hashes,
@@ -293,124 +295,173 @@ class ComplaintCreateView(generics.CreateAPIView):
             return
 
         # ── Filter B: AI-assisted visual verification + severity classification (Gemini Vision) ───────────
+        # The Gemini call runs on the ai_filter event loop, so the request
+        # returns at once with status FILTERING; _finish_filter_b() applies
+        # the verdict, sorts the complaint and emails the citizen.  Rows left
+        # in FILTERING by a worker restart are picked up by the
+        # recover_filtering management command.
         if complaint.image:
-            image_path = complaint.image.path
-            description = complaint.description
-            ai_result = 'ERROR'
-            error_detail = ''
-            ai_classification = None  # will hold {genuine, sla_hours, priority, emergency}
+            complaint.status = 'FILTERING'
+            complaint.save(update_fields=[
+                'filter_checked', 'filter_passed', 'filter_reason', 'is_spam',
+                'status', 'updated_at',
+            ])
+            complaint_id = complaint.pk
+            transaction.on_commit(lambda: classify_complaint_in_background(
+                complaint.image.path,
+                complaint.description,
+                lambda future: run_on(AI_FILTER, _finish_filter_b, complaint_id, future),
+            ))
+            return
 
-            try:
-                ai_classification = classify_complaint(image_path, description)
-                ai_result = ai_classification['genuine']  # 'YES' or 'NO'
-            except Exception as exc:
-                # Fail-safe: do not block complaint; route to manual review
-                error_detail = str(exc)
-                ai_result = 'ERROR'
-
-            # Log the AI decision for audit / transparency
-            AIVerificationLog.objects.create(
-                complaint=complaint,
-                result=ai_result,
-                description_snapshot=description,
-                image_path_snapshot=image_path,
-                error_detail=error_detail,
-                ai_sla_hours=ai_classification['sla_hours'] if ai_classification else None,
-                ai_priority=ai_classification['priority'] if ai_classification else None,
-                ai_emergency=ai_classification.get('emergency', False) if ai_classification else False,
-            )
+        _sort_and_notify(complaint, self.request.user, validation_result['reason'])
 
-            if ai_result == 'NO':
-                complaint.status = 'DECLINED'
-                complaint.filter_reason = (
-                    complaint.filter_reason
-                    + " | Filter B: AI-assisted verification failed — image does not match description."
-                )
-                complaint.save()
-                ComplaintLog.objects.create(
-                    complaint=complaint,
-                    action_by=self.request.user,
-                    note="Filter B (Gemini Vision) declined complaint: image does not match description.",
-                    new_status=complaint.status
-                )
-                send_complaint_created_email(complaint)
-                return
-
-            elif ai_result == 'ERROR':
-                complaint.status = 'PENDING_VERIFICATION'
-                complaint.save()
-                ComplaintLog.objects.create(
-                    complaint=complaint,
-                    action_by=self.request.user,
-                    note=f"Filter B (Gemini Vision) encountered an error; routed for manual review. Detail: {error_detail}",
-                    new_status=complaint.status
-                )
-                send_complaint_created_email(complaint)
-                return
 
-            # ai_result == 'YES' → complaint is verified; apply AI classification
-            complaint.is_genuine = True
+def _finish_filter_b(complaint_id, future):
+    """
+    Apply a background Filter B classification to the complaint.
 
-            if ai_classification:
-                complaint.sla_hours = ai_classification['sla_hours']
-                complaint.priority_level = ai_classification['priority']
-                complaint.is_emergency = ai_classification.get('emergency', False)
-                complaint.save(update_fields=[
-                    'is_genuine', 'sla_hours', 'priority_level', 'is_emergency', 'updated_at'
-                ])
+    ``future`` is the finished classify_complaint_in_background() future.
+    """
+    complaint = Complaint.objects.select_related(
+        'user', 'department', 'category__department'
+    ).get(pk=complaint_id)
+    if complaint.status != 'FILTERING':
+        return  # already finished by recover_filtering
+    apply_filter_b(complaint, future.result)
 
-        # ── Log: both filters cleared ────────────────────────────────────────────
-        ComplaintLog.objects.create(
-            complaint=complaint,
-            action_by=self.request.user,
-            note=(
-                f"Complaint passed all verification filters. "
-                f"Filter A result: {validation_result['reason']}"
-                + (
-                    " | Filter B (AI): image verified as genuine."
-                    if complaint.image else " | No image submitted; Filter B skipped."
-                )
-            ),
-            old_status='SUBMITTED',
-            new_status='FILTERING',
-        )
 
-        # ── Automated Department Sorting Layer ───────────────────────────────────
-        # Reads the department recorded at submission, transitions status through
-        # SORTING → PENDING, and auto-assigns the matching city office.
-        sorting_result = ComplaintSortingSystem.sort_complaint(complaint)
+def apply_filter_b(complaint, classify):
+    """
+    Run Filter B on a complaint waiting in FILTERING, then sort it and email
+    the citizen.
 
-        # Keep city/state metadata in sync (no-op if already correct).
-        ComplaintAssignmentSystem.assign_complaint(
-            complaint,
-            complaint.city,
-            complaint.state,
-        )
+    ``classify()`` returns the classification dict or raises; a failure
+    routes the complaint to manual review.  Also used by recover_filtering.
+    """
+    user = complaint.user
+    image_path = complaint.image.path
+    description = complaint.description
+    ai_result = 'ERROR'
+    error_detail = ''
+    ai_classification = None  # will hold {genuine, sla_hours, priority, emergency}
+
+    try:
+        ai_classification = classify()
+        ai_result = ai_classification['genuine']  # 'YES' or 'NO'
+    except Exception as exc:
+        # Fail-safe: do not block complaint; route to manual review
+        error_detail = str(exc)
+        ai_result = 'ERROR'
+
+    # Log the AI decision for audit / transparency
+    AIVerificationLog.objects.create(
+        complaint=complaint,
+        result=ai_result,
+        description_snapshot=description,
+        image_path_snapshot=image_path,
+        error_detail=error_detail,
+        ai_sla_hours=ai_classification['sla_hours'] if ai_classification else None,
+        ai_priority=ai_classification['priority'] if ai_classification else None,
+        ai_emergency=ai_classification.get('emergency', False) if ai_classification else False,
+    )
 
-        # Log the sorting decision for full traceability.
-        # old_status='FILTERING' → new_status='SORTING' represents the department-routing
-        # step only. The subsequent SORTING → ASSIGNED (or PENDING) transition is already
-        # logged independently by WorkerAssignmentLayer.assign_worker(), so keeping these
-        # two statuses distinct prevents the "Being Sorted → Assigned" entry from
-        # appearing twice in the activity log.
+    if ai_result == 'NO':
+        complaint.status = 'DECLINED'
+        complaint.filter_reason = (
+            complaint.filter_reason
+            + " | Filter B: AI-assisted verification failed — image does not match description."
+        )
+        complaint.save()
         ComplaintLog.objects.create(
             complaint=complaint,
-            action_by=self.request.user,
-            note=(
-                f"[Automated Department Sorting Layer] {sorting_result['reason']}"
-                if sorting_result['success']
-                else (
-                    f"[Automated Department Sorting Layer] Sorting could not complete automatically. "
-                    f"Reason: {sorting_result['reason']}"
-                )
-            ),
-            old_status='FILTERING',
-            new_status='SORTING',
-            new_dept=sorting_result.get('department'),
+            action_by=user,
+            note="Filter B (Gemini Vision) declined complaint: image does not match description.",
+            new_status=complaint.status
         )
+        send_complaint_created_email(complaint)
+        return
 
-        # Send confirmation email to citizen
+    elif ai_result == 'ERROR':
+        complaint.status = 'PENDING_VERIFICATION'
+        complaint.save()
+        ComplaintLog.objects.create(
+            complaint=complaint,
+            action_by=user,
+            note=f"Filter B (Gemini Vision) encountered an error; routed for manual review. Detail: {error_detail}",
+            new_status=complaint.status
+        )
         send_complaint_created_email(complaint)
+        return
+
+    # ai_result == 'YES' → complaint is verified; apply AI classification
+    complaint.is_genuine = True
+
+    if ai_classification:
+        complaint.sla_hours = ai_classification['sla_hours']
+        complaint.priority_level = ai_classification['priority']
+        complaint.is_emergency = ai_classification.get('emergency', False)
+        complaint.save(update_fields=[
+            'is_genuine', 'sla_hours', 'priority_level', 'is_emergency', 'updated_at'
+        ])
+
+    _sort_and_notify(complaint, user, complaint.filter_reason)
+
+
+def _sort_and_notify(complaint, user, filter_a_reason):
+    """Log the passed filters, route the complaint and email the citizen."""
+    # ── Log: both filters cleared ────────────────────────────────────────────
+    ComplaintLog.objects.create(
+        complaint=complaint,
+        action_by=user,
+        note=(
+            f"Complaint passed all verification filters. "
+            f"Filter A result: {filter_a_reason}"
+            + (
+                " | Filter B (AI): image verified as genuine."
+                if complaint.image else " | No image submitted; Filter B skipped."
+            )
+        ),
+        old_status='SUBMITTED',
+        new_status='FILTERING',
+    )
+
+    # ── Automated Department Sorting Layer ───────────────────────────────────
+    # Reads the department recorded at submission, transitions status through
+    # SORTING → PENDING, and auto-assigns the matching city office.
+    sorting_result = ComplaintSortingSystem.sort_complaint(complaint)
+
+    # Keep city/state metadata in sync (no-op if already correct).
+    ComplaintAssignmentSystem.assign_complaint(
+        complaint,
+        complaint.city,
+        complaint.state,
+    )
+
+    # Log the sorting decision for full traceability.
+    # old_status='FILTERING' → new_status='SORTING' represents the department-routing
+    # step only. The subsequent SORTING → ASSIGNED (or PENDING) transition is already
+    # logged independently by WorkerAssignmentLayer.assign_worker(), so keeping these
+    # two statuses distinct prevents the "Being Sorted → Assigned" entry from
+    # appearing twice in the activity log.
+    ComplaintLog.objects.create(
+        complaint=complaint,
+        action_by=user,
+        note=(
+            f"[Automated Department Sorting Layer] {sorting_result['reason']}"
+            if sorting_result['success']
+            else (
+                f"[Automated Department Sorting Layer] Sorting could not complete automatically. "
+                f"Reason: {sorting_result['reason']}"
+            )
+        ),
+        old_status='FILTERING',
+        new_status='SORTING',
+        new_dept=sorting_result.get('department'),
+    )
+
+    # Send confirmation email to citizen
+    send_complaint_created_email(complaint)
 
 
 class MyComplaintsView(generics.ListAPIView):
@@ -630,7 +681,9 @@ def assign_to_worker(request, pk):
 def verify_complaint(request, pk):
     """Verify a complaint as genuine (manual admin path for PENDING_VERIFICATION complaints)"""
     try:
-        complaint = get_object_or_404(Complaint, pk=pk)
+        complaint = get_object_or_404(
+            Complaint.objects.select_related('department', 'category__department'), pk=pk
+        )
 
         old_status = complaint.status
 
@@ -16,6 +16,15 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+
+def _env_bool(name, default):
+    """Read a yes/no setting from the environment, ignoring case."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -116,6 +125,22 @@ DATABASES = {
     }
 }
 
+# Cache — shared Redis when REDIS_URL is set, per-process memory otherwise
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 
 # Password validation
@@ -178,10 +203,14 @@ REST_FRAMEWORK = {
 }
 
 # Email Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
-EMAIL_HOST = 'smtp.gmail.com'
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+# The default backend pipelines SMTP envelope commands when the server
+# supports it.  For local development point EMAIL_HOST at a catch-all
+# server such as mailhog, or set EMAIL_BACKEND to Django's console/locmem
+# backend to send nothing over the network (the test runner always uses locmem).
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'civic_saathi.backends.PipeliningEmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_USE_TLS = _env_bool('EMAIL_USE_TLS', True)
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'CivicSaathi <civicsaathi@gmail.com>')
@@ -189,3 +218,39 @@ SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
 
 # Gemini AI - Filter B (AI-assisted complaint authenticity verification)
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+GEMINI_CLASSIFIER_MODEL = os.getenv('GEMINI_CLASSIFIER_MODEL', 'gemini-2.5-flash-lite')
+# Thinking tokens for the classifier model; unset means 0 (no reasoning
+# pass) for Flash models and the model's own default otherwise, since Pro
+# models cannot turn thinking off
+GEMINI_THINKING_BUDGET = os.getenv('GEMINI_THINKING_BUDGET') or None
+if GEMINI_THINKING_BUDGET is not None:
+    GEMINI_THINKING_BUDGET = int(GEMINI_THINKING_BUDGET)
+# Seconds to reuse a verdict for the same image + description (default 30 days)
+AI_CLASSIFICATION_CACHE_TIMEOUT = int(os.getenv('AI_CLASSIFICATION_CACHE_TIMEOUT', 60 * 60 * 24 * 30))
+
+# Logging - app records are written to stderr from a background thread, and
+# repeated tracebacks of the same exception type are sampled
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sample_tracebacks': {'()': 'civic_saathi.log.SamplingFilter'},
+    },
+    'formatters': {
+        'simple': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'background': {
+            'class': 'civic_saathi.log.BackgroundHandler',
+            'filters': ['sample_tracebacks'],
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        'civic_saathi': {
+            'handlers': ['background'],
+            'level': os.getenv('LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}